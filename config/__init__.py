@@ -27,6 +27,13 @@ DATABASE_URL = os.getenv(
     f"sqlite:///{DATA_DIR}/indicadores.db"
 )
 
+# Espelho local (SQLite) das leituras quando o banco principal é remoto (Postgres/Neon).
+# Opcional (LOCAL_MIRROR=1): cargas feitas por outro processo (scheduler, scripts de
+# ETL) não chegam ao espelho antes de ele vencer, então o TTL é também o atraso
+# máximo com que o painel passa a exibir os dados novos.
+LOCAL_MIRROR_ENABLED = os.getenv("LOCAL_MIRROR", "0") == "1"
+LOCAL_MIRROR_TTL_SECONDS = int(os.getenv("LOCAL_MIRROR_TTL_SECONDS", "3600"))
+
 # Logging
 LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
 LOG_FORMAT = "%(asctime)s [%(levelname)s] %(name)s - %(message)s"
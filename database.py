@@ -1,6 +1,9 @@
 import logging
+import os
+import threading
+import time
 from datetime import datetime
-from typing import Optional, List, Dict
+from typing import Optional, List, Dict, Tuple
 
 import pandas as pd
 from sqlalchemy import (
@@ -11,6 +14,7 @@ from sqlalchemy import (
     Integer,
     String,
     UniqueConstraint,
+    bindparam,
     create_engine,
     text,
     exc
@@ -18,7 +22,15 @@ from sqlalchemy import (
 from sqlalchemy.orm import declarative_base, sessionmaker, Session
 from sqlalchemy.sql import func
 
-from config import DATABASE_URL, COD_IBGE, MUNICIPIO, UF
+from config import (
+    DATABASE_URL,
+    COD_IBGE,
+    DB_DIR,
+    LOCAL_MIRROR_ENABLED,
+    LOCAL_MIRROR_TTL_SECONDS,
+    MUNICIPIO,
+    UF,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -43,6 +55,21 @@ except Exception as e:
     engine = None
     SessionLocal = None
 
+# Espelho local (SQLite) das séries para leitura: com banco remoto, cada consulta
+# do painel custaria uma ida à rede. A tabela do município é copiada para um
+# arquivo local, em segundo plano, e ressincronizada a cada LOCAL_MIRROR_TTL_SECONDS
+# ou logo após uma gravação deste processo. Enquanto não há cópia válida, lê-se o
+# banco principal. Opcional (LOCAL_MIRROR=1): gravações de outros processos só
+# aparecem quando o TTL vence.
+MIRROR_PATH = DB_DIR / "indicators_mirror.db"
+_mirror_engine = None
+_mirror_checked_at: Optional[float] = None  # None: espelho ausente ou expirado
+_mirror_generation = 0  # incrementado a cada expiração (descarta cópias em andamento)
+_mirror_refreshing = False
+_mirror_failed_at: Optional[float] = None
+MIRROR_RETRY_SECONDS = 60  # espera após uma cópia com falha antes de tentar de novo
+_mirror_lock = threading.Lock()
+
 Base = declarative_base()
 
 class Indicator(Base):
@@ -91,6 +118,122 @@ def init_db() -> bool:
         logger.error(f"Erro ao inicializar banco de dados: {e}")
         return False
 
+def _read_frame(conn, query, params: Dict) -> pd.DataFrame:
+    """Executa a consulta e monta o DataFrame direto das linhas do cursor.
+
+    Equivale a pd.read_sql para as consultas simples deste módulo, sem a camada
+    de abstração do pandas (inspeção de tipo de conexão, wrappers SQLDatabase).
+    """
+    result = conn.execute(query, params)
+    return pd.DataFrame.from_records(result.fetchall(), columns=list(result.keys()), coerce_float=True)
+
+def _is_remote_db() -> bool:
+    return DATABASE_URL.startswith("postgresql")
+
+def refresh_local_mirror() -> bool:
+    """Copia a tabela indicators do município para o espelho SQLite local.
+
+    O arquivo é gravado em um temporário e trocado atomicamente, de modo que
+    leituras em andamento nunca vejam um espelho pela metade.
+    """
+    global _mirror_engine, _mirror_checked_at, _mirror_failed_at
+    if engine is None:
+        return False
+
+    with _mirror_lock:
+        generation = _mirror_generation
+    tmp_path = MIRROR_PATH.with_suffix(".tmp")
+    try:
+        with engine.connect() as conn:
+            df = _read_frame(
+                conn,
+                text("""
+                    SELECT municipality_code, indicator_key, source, year, month, value, unit
+                    FROM indicators
+                    WHERE municipality_code = :code
+                """),
+                {"code": COD_IBGE},
+            )
+
+        tmp_path.unlink(missing_ok=True)
+        tmp_engine = create_engine(f"sqlite:///{tmp_path}", future=True)
+        try:
+            with tmp_engine.begin() as conn:
+                df.to_sql("indicators", conn, index=False)
+                conn.execute(text(
+                    "CREATE INDEX ix_mirror_key ON indicators (indicator_key, source, year, month)"
+                ))
+        finally:
+            tmp_engine.dispose()
+        with _mirror_lock:
+            if generation != _mirror_generation:
+                # Houve gravação durante a cópia: ela já nasceu desatualizada
+                tmp_path.unlink(missing_ok=True)
+                return False
+            os.replace(tmp_path, MIRROR_PATH)
+            if _mirror_engine is None:
+                _mirror_engine = create_engine(f"sqlite:///{MIRROR_PATH}", future=True)
+            else:
+                # Descarta conexões abertas no arquivo anterior
+                _mirror_engine.dispose()
+            _mirror_checked_at = time.monotonic()
+            _mirror_failed_at = None
+        logger.info("Espelho local atualizado: %s registros em %s", len(df), MIRROR_PATH)
+        return True
+    except Exception as e:
+        logger.warning(f"Falha ao atualizar espelho local; leituras seguem no banco principal: {e}")
+        tmp_path.unlink(missing_ok=True)
+        _mirror_failed_at = time.monotonic()
+        return False
+
+def expire_local_mirror() -> None:
+    """Marca o espelho local como desatualizado após uma gravação.
+
+    As leituras voltam ao banco principal até que uma nova cópia, já com a gravação,
+    fique pronta; uma cópia iniciada antes da expiração é descartada.
+    """
+    global _mirror_checked_at, _mirror_generation, _mirror_failed_at
+    with _mirror_lock:
+        _mirror_checked_at = None
+        _mirror_failed_at = None
+        _mirror_generation += 1
+
+def _refresh_mirror_in_background() -> None:
+    """Dispara refresh_local_mirror em uma thread (no máximo uma cópia por vez)."""
+    global _mirror_refreshing
+    with _mirror_lock:
+        failed_at = _mirror_failed_at
+        if _mirror_refreshing or (
+            failed_at is not None and time.monotonic() - failed_at < MIRROR_RETRY_SECONDS
+        ):
+            return
+        _mirror_refreshing = True
+
+    def run():
+        global _mirror_refreshing
+        try:
+            refresh_local_mirror()
+        finally:
+            with _mirror_lock:
+                _mirror_refreshing = False
+
+    threading.Thread(target=run, name="indicators-mirror", daemon=True).start()
+
+def _read_engine():
+    """Engine das consultas de leitura: espelho local quando o banco é remoto.
+
+    A cópia nunca é feita na thread da requisição: com o espelho ausente, expirado
+    ou vencido, a leitura vai ao banco principal e a atualização segue em segundo plano.
+    """
+    if not (LOCAL_MIRROR_ENABLED and _is_remote_db()):
+        return engine
+
+    checked_at = _mirror_checked_at
+    if checked_at is None or time.monotonic() - checked_at > LOCAL_MIRROR_TTL_SECONDS:
+        _refresh_mirror_in_background()
+        return engine
+    return _mirror_engine or engine
+
 def get_session() -> Optional[Session]:
     """Retorna uma sessão de banco com tratamento de erro."""
     if SessionLocal is None:
@@ -168,6 +311,7 @@ def upsert_indicators(
                 inserted += 1
         
         session.commit()
+        expire_local_mirror()
     except Exception as e:
         session.rollback()
         logger.error(f"Falha no upsert de {indicator_key}: {e}")
@@ -198,8 +342,8 @@ def get_timeseries(indicator_key: str, source: Optional[str] = None) -> pd.DataF
     base_query += " ORDER BY year, month"
 
     try:
-        with engine.connect() as conn:
-            df = pd.read_sql(text(base_query), conn, params=params)
+        with _read_engine().connect() as conn:
+            df = _read_frame(conn, text(base_query), params)
         
         if not df.empty:
             df.rename(columns={"year": "Ano", "month": "Mes", "value": "Valor", "unit": "Unidade"}, inplace=True)
@@ -208,22 +352,163 @@ def get_timeseries(indicator_key: str, source: Optional[str] = None) -> pd.DataF
         logger.error(f"Erro ao consultar série {indicator_key}: {e}")
         return pd.DataFrame()
 
+def _query_timeseries_many(indicator_keys: List[str], source: Optional[str] = None) -> pd.DataFrame:
+    """Executa uma única consulta WHERE indicator_key IN (...) e padroniza as colunas.
+
+    Propaga exceções do banco; retorna DataFrame vazio quando não há engine ou registros.
+    """
+    if engine is None or not indicator_keys:
+        return pd.DataFrame()
+
+    params = {"code": COD_IBGE, "keys": list(indicator_keys)}
+    base_query = """
+        SELECT indicator_key, year, month, value, unit, source
+        FROM indicators
+        WHERE municipality_code = :code
+          AND indicator_key IN :keys
+    """
+
+    if source:
+        base_query += " AND source = :source"
+        params["source"] = source
+
+    base_query += " ORDER BY indicator_key, year, month"
+    query = text(base_query).bindparams(bindparam("keys", expanding=True))
+
+    with _read_engine().connect() as conn:
+        df = _read_frame(conn, query, params)
+
+    if not df.empty:
+        df.rename(columns={"year": "Ano", "month": "Mes", "value": "Valor", "unit": "Unidade"}, inplace=True)
+    return df
+
+def get_timeseries_bulk(indicator_keys: List[str], source: Optional[str] = None) -> Dict[str, pd.DataFrame]:
+    """Recupera várias séries históricas em uma única consulta (WHERE indicator_key IN ...).
+
+    Retorna um dicionário chave -> DataFrame no mesmo formato de get_timeseries,
+    preservando a ordem de indicator_keys (DataFrame vazio quando não há dados).
+    """
+    result = {key: pd.DataFrame() for key in indicator_keys}
+    try:
+        df = _query_timeseries_many(indicator_keys, source)
+        if df.empty:
+            return result
+        # Colunas de texto repetitivas como categóricas e ano em int16 (Valor
+        # permanece float64: séries monetárias excedem a precisão de float32)
+        df = df.astype({
+            "indicator_key": "category",
+            "source": "category",
+            "Unidade": "category",
+            "Ano": "int16",
+        })
+        for key, group in df.groupby("indicator_key", sort=False, observed=True):
+            result[key] = group.drop(columns="indicator_key").reset_index(drop=True)
+        return result
+    except Exception as e:
+        logger.error(f"Erro ao consultar séries {indicator_keys}: {e}")
+        return result
+
+def get_timeseries_pairs(
+    pairs: List[Tuple[str, Optional[str]]]
+) -> Dict[Tuple[str, Optional[str]], pd.DataFrame]:
+    """Recupera séries de vários pares (indicador, fonte) com uma única consulta.
+
+    Fonte None equivale a get_timeseries(indicador) sem filtro de fonte.
+    Retorna um dicionário (indicador, fonte) -> DataFrame no formato de
+    get_timeseries (DataFrame vazio quando não há dados).
+    """
+    result = {pair: pd.DataFrame() for pair in pairs}
+    keys = list(dict.fromkeys(key for key, _ in pairs))
+    try:
+        df = _query_timeseries_many(keys)
+        if df.empty:
+            return result
+        by_key = {key: group for key, group in df.groupby("indicator_key", sort=False)}
+        for key, source in pairs:
+            group = by_key.get(key)
+            if group is None:
+                continue
+            if source:
+                group = group[group["source"] == source]
+            if not group.empty:
+                result[(key, source)] = group.drop(columns="indicator_key").reset_index(drop=True)
+        return result
+    except Exception as e:
+        logger.error(f"Erro ao consultar séries {keys}: {e}")
+        return result
+
+def get_latest_values(pairs: List[Tuple[str, Optional[str]]]) -> pd.DataFrame:
+    """Última observação de cada par (indicador, fonte), calculada no banco.
+
+    Uma única consulta agrupa por indicador/fonte e traz apenas as linhas do ano
+    mais recente; no mesmo ano prevalece o último mês. Fonte None considera todas
+    as fontes do indicador. Retorna colunas indicator_key, source, Ano, Mes, Valor,
+    Unidade na ordem de `pairs` (pares sem dados são omitidos).
+    """
+    columns = ["indicator_key", "source", "Ano", "Mes", "Valor", "Unidade"]
+    keys = list(dict.fromkeys(key for key, _ in pairs))
+    if engine is None or not keys:
+        return pd.DataFrame(columns=columns)
+
+    query = text("""
+        SELECT i.indicator_key, i.source, i.year, i.month, i.value, i.unit
+        FROM indicators i
+        JOIN (
+            SELECT indicator_key, source, MAX(year) AS max_year
+            FROM indicators
+            WHERE municipality_code = :code
+              AND indicator_key IN :keys
+            GROUP BY indicator_key, source
+        ) lt
+          ON i.indicator_key = lt.indicator_key
+         AND i.source = lt.source
+         AND i.year = lt.max_year
+        WHERE i.municipality_code = :code
+        ORDER BY i.indicator_key, i.year, i.month
+    """).bindparams(bindparam("keys", expanding=True))
+
+    try:
+        with _read_engine().connect() as conn:
+            df = _read_frame(conn, query, {"code": COD_IBGE, "keys": keys})
+    except Exception as e:
+        logger.error(f"Erro ao consultar últimos valores de {keys}: {e}")
+        return pd.DataFrame(columns=columns)
+
+    df.rename(columns={"year": "Ano", "month": "Mes", "value": "Valor", "unit": "Unidade"}, inplace=True)
+    rows = []
+    for key, source in pairs:
+        sel = df[df["indicator_key"] == key]
+        if source:
+            sel = sel[sel["source"] == source]
+        if not sel.empty:
+            # Ordenado por ano/mês: a última linha é a observação mais recente
+            rows.append(sel.iloc[-1])
+    if not rows:
+        return pd.DataFrame(columns=columns)
+    return pd.DataFrame(rows, columns=columns).reset_index(drop=True)
+
 def list_indicators(municipality_code: Optional[str] = None) -> List[Dict]:
-    """Lista indicadores disponíveis no banco."""
+    """Lista indicadores disponíveis no banco, com o primeiro e o último ano de cada série."""
     if engine is None:
         return []
 
     code = municipality_code or COD_IBGE
     query = text("""
-        SELECT DISTINCT indicator_key, source, unit
+        SELECT indicator_key, source, unit, MIN(year), MAX(year)
         FROM indicators
         WHERE municipality_code = :code
+        GROUP BY indicator_key, source, unit
         ORDER BY indicator_key, source
     """)
+    # O espelho local contém apenas o município configurado
+    read_engine = _read_engine() if code == COD_IBGE else engine
     try:
-        with engine.connect() as conn:
+        with read_engine.connect() as conn:
             rows = conn.execute(query, {"code": code}).fetchall()
-        return [{"indicator_key": r[0], "source": r[1], "unit": r[2] or ""} for r in rows]
+        return [
+            {"indicator_key": r[0], "source": r[1], "unit": r[2] or "", "min_ano": r[3], "max_ano": r[4]}
+            for r in rows
+        ]
     except Exception as e:
         logger.error(f"Erro ao listar indicadores: {e}")
         return []
@@ -5,18 +5,35 @@ Implementa verificação contínua da saúde de APIs, dados e processos.
 
 import logging
 import asyncio
+import os
+import re
 import requests
+import threading
 import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Dict, Any, List, Optional
+from functools import cached_property
+from typing import Dict, Any, List, Optional, Tuple
 from pathlib import Path
 
+from sqlalchemy import text
+
 from config import DATA_DIR, COD_IBGE, MUNICIPIO, UF
 from utils.fallback_manager import fallback_manager
 from utils.alert_manager import alert_manager
 
 logger = logging.getLogger(__name__)
 
+# Máximo de sondagens HTTP simultâneas nas verificações de API
+API_CHECK_MAX_WORKERS = 8
+# Janela de linhas do etl.log usada no cálculo da taxa de falha
+ETL_LOG_WINDOW = 50
+# Na primeira leitura, lê apenas o final do arquivo (bytes)
+ETL_LOG_INITIAL_TAIL_BYTES = 64 * 1024
+ETL_FINISHED_MARKER = 'Job de atualização finalizado'
+ETL_TIMESTAMP_RE = re.compile(r'(\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2})')
+
 class HealthChecker:
     """Verificador de saúde do sistema Painel GV."""
     
@@ -31,6 +48,18 @@ class HealthChecker:
         # Status cache para evitar verificações excessivas
         self.status_cache = {}
         self.cache_duration = timedelta(minutes=5)
+        
+        # Estado da leitura incremental do etl.log (instância compartilhada entre
+        # sessões e threads: protegido por _etl_log_lock)
+        self._etl_log_lock = threading.Lock()
+        self._etl_log_stat = None
+        self._etl_log_offset = 0
+        self._etl_partial_line = b''
+        self._etl_skip_first_line = False
+        self._etl_error_window = deque(maxlen=ETL_LOG_WINDOW)
+        self._etl_error_count = 0
+        self._etl_last_run = None
+        self._etl_cached_metrics = None
     
     def _is_cache_valid(self, cache_key: str) -> bool:
         """Verifica se o cache ainda é válido."""
@@ -47,6 +76,11 @@ class HealthChecker:
             'status': status
         }
     
+    @cached_property
+    def api_source_names(self) -> Tuple[str, ...]:
+        """Fontes de API configuradas (estáticas por processo, ordem estável)."""
+        return tuple(self.fallback_manager.fallback_sources.keys())
+    
     def check_api_health(self, api_name: str = None) -> Dict[str, Any]:
         """Verifica saúde de APIs específicas ou de todas."""
         cache_key = f"api_health_{api_name or 'all'}"
@@ -70,9 +104,11 @@ class HealthChecker:
                 health_status['status'] = 'degraded'
                 health_status['issues'].append(f"{api_name}: {status['message']}")
         else:
-            # Verificar todas as APIs configuradas
-            for source in self.fallback_manager.fallback_sources.keys():
-                status = self._check_single_api(source)
+            # Verificar todas as APIs configuradas (sondagens HTTP em paralelo)
+            sources = self.api_source_names
+            with ThreadPoolExecutor(max_workers=max(1, min(API_CHECK_MAX_WORKERS, len(sources)))) as executor:
+                results = list(executor.map(self._check_single_api, sources))
+            for source, status in zip(sources, results):
                 health_status['sources'][source] = status
                 if status['status'] != 'healthy':
                     health_status['status'] = 'degraded'
@@ -157,16 +193,20 @@ class HealthChecker:
             # Testar conexão
             start_time = time.time()
             with get_session() as session:
-                # Contar tabelas
-                result = session.execute(text("SELECT COUNT(DISTINCT indicator_key) FROM indicators")).fetchone()
-                status['table_count'] = result[0] if result else 0
-                
-                # Testar query simples
-                result = session.execute(text("SELECT COUNT(*) FROM indicators LIMIT 1")).fetchone()
+                # Contar indicadores e testar leitura em uma única ida ao banco
+                row = session.execute(text(
+                    "SELECT (SELECT COUNT(DISTINCT indicator_key) FROM indicators) AS tbls, "
+                    "(SELECT 1 FROM indicators LIMIT 1) AS alive"
+                )).fetchone()
+                status['table_count'] = row.tbls if row else 0
                 status['last_query'] = datetime.now().isoformat()
                 
             status['connection_time'] = (time.time() - start_time) * 1000
-            status['status'] = 'healthy'
+            
+            if not row or row.alive != 1:
+                status['status'] = 'degraded'
+                status['message'] = "Tabela indicators sem registros"
+                status['issues'].append(status['message'])
             
         except Exception as e:
             status['status'] = 'error'
@@ -176,6 +216,57 @@ class HealthChecker:
         self._save_to_cache(cache_key, status)
         return status
     
+    def _read_etl_log_forward(self, etl_log: Path, st: os.stat_result):
+        """Lê apenas os bytes novos do etl.log, atualizando o contador de erros.
+
+        Uma linha ainda sem quebra no final fica em buffer e só é contada quando completa.
+        Deve ser chamado com _etl_log_lock adquirido.
+        """
+        # Primeira leitura, arquivo rotacionado ou truncado: reiniciar o estado incremental
+        if (
+            self._etl_log_stat is None
+            or st.st_ino != self._etl_log_stat[0]
+            or st.st_size < self._etl_log_offset
+        ):
+            self._etl_error_window.clear()
+            self._etl_error_count = 0
+            self._etl_last_run = None
+            self._etl_log_offset = max(0, st.st_size - ETL_LOG_INITIAL_TAIL_BYTES)
+            self._etl_partial_line = b''
+            # Começando no meio do arquivo, a primeira linha lida está cortada
+            self._etl_skip_first_line = self._etl_log_offset > 0
+        
+        with open(etl_log, 'rb') as f:
+            f.seek(self._etl_log_offset)
+            chunk = f.read(st.st_size - self._etl_log_offset)
+        self._etl_log_offset += len(chunk)
+        
+        # Processar somente linhas completas; o restante aguarda no buffer
+        data = self._etl_partial_line + chunk
+        last_newline = data.rfind(b'\n')
+        if last_newline < 0:
+            self._etl_partial_line = data
+            return
+        complete, self._etl_partial_line = data[:last_newline + 1], data[last_newline + 1:]
+        lines = complete.decode('utf-8', errors='replace').splitlines()
+        
+        # Descartar a linha cortada no início da janela inicial
+        if self._etl_skip_first_line:
+            lines = lines[1:]
+            self._etl_skip_first_line = False
+        
+        for line in lines:
+            is_error = 'ERROR' in line
+            if len(self._etl_error_window) == self._etl_error_window.maxlen:
+                self._etl_error_count -= self._etl_error_window[0]
+            self._etl_error_window.append(is_error)
+            self._etl_error_count += is_error
+            
+            if ETL_FINISHED_MARKER in line:
+                match = ETL_TIMESTAMP_RE.search(line)
+                if match:
+                    self._etl_last_run = match.group(0)
+    
     def check_etl_health(self) -> Dict[str, Any]:
         """Verifica saúde dos processos ETL."""
         cache_key = "etl_health"
@@ -197,27 +288,29 @@ class HealthChecker:
             # Verificar logs do ETL
             etl_log = DATA_DIR / "logs" / "etl.log"
             if etl_log.exists():
-                with open(etl_log, 'r', encoding='utf-8') as f:
-                    lines = f.readlines()[-50:]  # Últimas 50 linhas
+                # Da comparação do stat ao fim da leitura: duas sessões nunca leem os
+                # mesmos bytes nem avançam o offset ao mesmo tempo
+                with self._etl_log_lock:
+                    st = os.stat(etl_log)
+                    log_stat = (st.st_ino, st.st_size, st.st_mtime_ns)
                     
-                # Contar falhas recentes
-                recent_errors = sum(1 for line in lines if 'ERROR' in line)
-                recent_total = len(lines)
-                
-                if recent_total > 0:
-                    status['failure_rate'] = recent_errors / recent_total
-                    if status['failure_rate'] > 0.05:  # 5% de falha
-                        status['status'] = 'degraded'
-                        status['message'] = f"Taxa de falha no ETL: {status['failure_rate']:.2%}"
-                
-                # Buscar última execução bem-sucedida
-                for line in reversed(lines):
-                    if 'Job de atualização finalizado' in line:
-                        import re
-                        match = re.search(r'(\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2})', line)
-                        if match:
-                            status['last_run'] = match.group(0)
-                            break
+                    # Arquivo inalterado desde a última leitura: reaproveitar métricas
+                    if log_stat == self._etl_log_stat and self._etl_cached_metrics is not None:
+                        self._save_to_cache(cache_key, self._etl_cached_metrics)
+                        return self._etl_cached_metrics
+                    
+                    self._read_etl_log_forward(etl_log, st)
+                    self._etl_log_stat = log_stat
+                    
+                    recent_total = len(self._etl_error_window)
+                    if recent_total > 0:
+                        status['failure_rate'] = self._etl_error_count / recent_total
+                        if status['failure_rate'] > 0.05:  # 5% de falha
+                            status['status'] = 'degraded'
+                            status['message'] = f"Taxa de falha no ETL: {status['failure_rate']:.2%}"
+                    
+                    status['last_run'] = self._etl_last_run
+                    self._etl_cached_metrics = status
                             
         except Exception as e:
             status['status'] = 'error'
@@ -267,13 +360,16 @@ class HealthChecker:
             'overall_score': 1.0
         }
         
-        # Verificar cada componente
-        components = {
-            'apis': self.check_api_health(),
-            'database': self.check_database_health(),
-            'etl': self.check_etl_health(),
-            'cache': self.check_cache_health()
+        # Verificar cada componente (checagens independentes, executadas em paralelo)
+        checks = {
+            'apis': self.check_api_health,
+            'database': self.check_database_health,
+            'etl': self.check_etl_health,
+            'cache': self.check_cache_health
         }
+        with ThreadPoolExecutor(max_workers=len(checks)) as executor:
+            futures = {component: executor.submit(check) for component, check in checks.items()}
+        components = {component: future.result() for component, future in futures.items()}
         
         scores = []
         issues = []
@@ -346,7 +442,7 @@ class HealthChecker:
             'metrics': {
                 component: health_status['components']
             },
-            'recent_alerts': self.alert_manager.alert_history[-10:]
+            'recent_alerts': self.alert_manager.get_recent_alerts(10)
         }
         
         return dashboard_data
@@ -155,7 +155,7 @@ def create_metrics_dashboard():
     # Alertas Recentes
     st.subheader("📊 Alertas Recentes")
     
-    recent_alerts = alert_manager.alert_history[-10:]
+    recent_alerts = alert_manager.get_recent_alerts(10)
     
     if recent_alerts:
         # Converter para DataFrame
@@ -193,7 +193,7 @@ def create_metrics_dashboard():
     events = []
     
     # Adicionar eventos de alertas
-    for alert in alert_manager.alert_history[-5:]:
+    for alert in alert_manager.get_recent_alerts(5):
         events.append({
             'timestamp': datetime.fromisoformat(alert['timestamp']),
             'type': 'alert',
@@ -3,27 +3,53 @@ Dashboard Executivo para Gestão Municipal
 Painel com KPIs, tendências e comparativos estratégicos.
 """
 
+import importlib.util
+import math
+from functools import lru_cache
+
 import streamlit as st
-import plotly.express as px
 import pandas as pd
-import numpy as np
 from datetime import datetime, timedelta
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Tuple
 
-from database import get_timeseries, list_indicators
+from database import get_timeseries_bulk, list_indicators
 from monitoring.health_checker import health_checker
 from utils.alert_manager import alert_manager
 from config import MUNICIPIO, UF
 
+# Série considerada atualizada se tem dado de até N anos antes do ano corrente
+# (as fontes anuais, como IBGE e RAIS, publicam com defasagem)
+DADOS_RECENTES_ANOS = 2
+
+@st.cache_data(ttl=300)
+def _kpi_indicadores() -> Tuple[int, int, float, float]:
+    """Total de indicadores, quantos têm unidade, % de qualidade e % de séries com
+    dados recentes (cache de 5 min)."""
+    total = 0
+    com_unidade = 0
+    recentes = 0
+    ano_corte = datetime.now().year - DADOS_RECENTES_ANOS
+    for i in list_indicators():
+        total += 1
+        if (i.get("unit") or "").strip():
+            com_unidade += 1
+        if (i.get("max_ano") or 0) >= ano_corte:
+            recentes += 1
+    qualidade_pct = (com_unidade / total * 100) if total else 0.0
+    recentes_pct = (recentes / total * 100) if total else 0.0
+    return total, com_unidade, qualidade_pct, recentes_pct
+
 def create_executive_dashboard():
     """Cria dashboard executivo para gestão municipal."""
     st.title("📊 Dashboard Executivo - Gestão Municipal")
     st.caption(f"**Observatório Estratégico** - {MUNICIPIO}/{UF}")
     
+    # Uma única verificação de saúde por render, reaproveitada pelas seções abaixo
+    # (o health_checker mantém o status em cache por 5 min)
+    health_status = health_checker.check_all_components()
+    
     # Status do Sistema
     with st.expander("🔍 Status do Sistema", expanded=False):
-        health_status = health_checker.check_all_components()
-        
         col1, col2, col3, col4 = st.columns(4)
         
         with col1:
@@ -31,18 +57,21 @@ def create_executive_dashboard():
             st.metric("📈 Status Geral", f"{status_emoji} {health_status['status'].title()}")
         
         with col2:
-            apis_healthy = len([s for s in health_status['components']['apis']['sources'].values() 
-                              if s['status'] == 'healthy'])
+            apis_healthy = sum(1 for s in health_status['components']['apis']['sources'].values()
+                               if s['status'] == 'healthy')
             total_apis = len(health_status['components']['apis']['sources'])
             st.metric("🔄 APIs Saudáveis", f"{apis_healthy}/{total_apis}", 
                      f"{(apis_healthy/total_apis)*100:.0f}%")
         
         with col3:
-            data_fresh = health_status['components']['data']['freshness_score']
-            st.metric("📊 Dados Atualizados", f"{data_fresh:.1f}%")
+            recentes_pct = _kpi_indicadores()[3]
+            st.metric(
+                "📊 Dados Atualizados", f"{recentes_pct:.1f}%",
+                help=f"Séries com dado de {datetime.now().year - DADOS_RECENTES_ANOS} ou posterior",
+            )
         
         with col4:
-            active_alerts = len(alert_manager.alert_history[-10:])
+            active_alerts = min(len(alert_manager.alert_history), 10)
             st.metric("⚠️ Alertas Ativas", f"{active_alerts}")
     
     # KPIs Principais (somente com dados reais)
@@ -50,10 +79,7 @@ def create_executive_dashboard():
     
     col1, col2, col3 = st.columns(3)
     
-    indicators = list_indicators()
-    total_indicadores = len(indicators)
-    com_unidade = len([i for i in indicators if (i.get("unit") or "").strip()])
-    qualidade_pct = (com_unidade / total_indicadores * 100) if total_indicadores else 0.0
+    total_indicadores, com_unidade, qualidade_pct, _ = _kpi_indicadores()
     
     with col1:
         st.metric("Indicadores no banco", f"{total_indicadores}")
@@ -72,16 +98,22 @@ def create_executive_dashboard():
     with col1:
         st.subheader("🔄 APIs Externas")
         
-        api_health = health_checker.check_api_health()
+        api_health = health_status['components']['apis']
         
-        for source, status in api_health['sources'].items():
-            status_emoji = "✅" if status['status'] == 'healthy' else "⚠️"
-            st.metric(f"{source}", f"{status_emoji} {status['status'].title()}")
+        rows = [
+            (source, f"{'✅' if status['status'] == 'healthy' else '⚠️'} {status['status'].title()}")
+            for source, status in api_health['sources'].items()
+        ]
+        st.dataframe(
+            pd.DataFrame(rows, columns=['API', 'Status']),
+            hide_index=True,
+            use_container_width=True,
+        )
     
     with col2:
         st.subheader("📊 Processos ETL")
         
-        etl_health = health_checker.check_etl_health()
+        etl_health = health_status['components']['etl']
         
         st.metric("🔄 ETL Status", f"{etl_health['status'].title()}")
         if etl_health['last_run']:
@@ -100,12 +132,12 @@ def create_executive_dashboard():
     st.subheader("📊 Análise Comparativa")
     
     # Implementar comparações intermunicipais
-    create_comparatives_section()
+    create_comparativos_section()
     
     # Alertas Recentes
     st.subheader("📊 Alertas Recentes")
     
-    recent_alerts = alert_manager.alert_history[-5:]
+    recent_alerts = alert_manager.get_recent_alerts(5)
     if recent_alerts:
         for alert in recent_alerts:
             st.warning(f"• {alert['timestamp']}: [{alert['type'].upper()}] {alert['message']}")
@@ -115,6 +147,11 @@ def create_executive_dashboard():
     st.divider()
     
     # Ações Rápidas
+    _render_acoes_rapidas()
+
+@st.fragment
+def _render_acoes_rapidas():
+    """Botões de ação; como fragmento, o clique não remonta o restante do dashboard."""
     st.subheader("🚀 Ações Rápidas")
     
     col_action1, col_action2 = st.columns(2)
@@ -134,37 +171,74 @@ def create_executive_dashboard():
             st.success("Relatório gerado com sucesso!")
             st.info(f"Relatório salvo em: {docx_path.name}")
 
+@st.cache_resource(max_entries=32)
+def _build_trends_fig(trend_series: Tuple[Tuple[str, Tuple[int, ...], Tuple[float, ...]], ...]):
+    """Monta o gráfico de tendências (reaproveitado entre reruns enquanto os dados não mudam)."""
+    import plotly.graph_objects as go
+    from plotly.subplots import make_subplots
+    
+    n_cols = 2
+    n_rows = math.ceil(len(trend_series) / n_cols)
+    fig = make_subplots(
+        rows=n_rows, cols=n_cols,
+        subplot_titles=[f"{indicator} - Tendência" for indicator, _, _ in trend_series],
+    )
+    for idx, (indicator, anos, valores) in enumerate(trend_series):
+        fig.add_trace(
+            go.Scattergl(x=anos, y=valores, mode='lines+markers', name=indicator),
+            row=idx // n_cols + 1, col=idx % n_cols + 1,
+        )
+    fig.update_layout(height=350 * n_rows, showlegend=False)
+    return fig
+
+@lru_cache(maxsize=1)
+def _configure_plotly_json() -> None:
+    """Usa orjson na serialização das figuras Plotly quando disponível (executado uma vez)."""
+    if importlib.util.find_spec("orjson") is not None:
+        import plotly.io as pio
+        pio.json.config.default_engine = "orjson"
+
 def create_trends_section():
     """Cria seção de tendências estratégicas."""
+    # Imports pesados apenas quando a seção é renderizada
+    import numpy as np
+    from panel.trend_kernels import slopes_csr
+    
+    _configure_plotly_json()
+    
     # Implementar visualizações de tendências críticas
     critical_indicators = [
         'PIB_TOTAL', 'EMPREGOS_FORMAIS', 'EMPRESAS_SEBRAE', 'IDSC_GERAL'
     ]
     
-    for indicator in critical_indicators:
-        df = get_timeseries(indicator, source=None)
-        if not df.empty:
-            st.subheader(f"📈 {indicator}")
-            
-            # Calcular tendência
-            if len(df) >= 2:
-                x = df['Ano'].values
-                y = df['Valor'].values
-                slope = np.polyfit(x, y)[0]  # Coeficiente angular
-                
-                trend = "crescente" if slope > 0 else "decrescente" if slope < 0 else "estável"
-                
-                # Visualização
-                fig = px.line(df, x='Ano', y='Valor', 
-                               title=f"{indicator} - Tendência", markers=True)
-                st.plotly_chart(fig, use_container_width=True)
-                
-                # Métrica de tendência
-                st.metric("📈 Tendência", trend.title())
-                
-                # Último valor
-                latest = df.iloc[-1]
-                st.caption(f"Último valor: {latest['Valor']:,.0f} em {int(latest['Ano'])}")
+    series = get_timeseries_bulk(critical_indicators)
+    
+    # Calcular tendências de todas as séries de uma vez (formato CSR)
+    com_tendencia = [k for k, df in series.items() if len(df) >= 2]
+    slopes = {}
+    if com_tendencia:
+        offsets = np.concatenate(([0], np.cumsum([len(series[k]) for k in com_tendencia])))
+        years = np.concatenate([series[k]['Ano'].to_numpy(dtype=float) for k in com_tendencia])
+        values = np.concatenate([series[k]['Valor'].to_numpy(dtype=float) for k in com_tendencia])
+        slopes = dict(zip(com_tendencia, slopes_csr(values, years, offsets)))
+    
+    if not slopes:
+        return
+    
+    # Um único gráfico com subplots em vez de um st.plotly_chart por indicador
+    fig = _build_trends_fig(tuple(
+        (indicator, tuple(series[indicator]['Ano'].tolist()), tuple(series[indicator]['Valor'].tolist()))
+        for indicator in slopes
+    ))
+    st.plotly_chart(fig, use_container_width=True)
+    
+    # Métricas de tendência e último valor por indicador
+    for col, (indicator, slope) in zip(st.columns(len(slopes)), slopes.items()):
+        trend = "crescente" if slope > 0 else "decrescente" if slope < 0 else "estável"
+        latest = series[indicator].iloc[-1]
+        with col:
+            st.metric(f"📈 {indicator}", trend.title())
+            st.caption(f"Último valor: {latest['Valor']:,.0f} em {int(latest['Ano'])}")
 
 def create_comparativos_section():
     """Cria seção de análise comparativa."""
@@ -189,60 +263,55 @@ def get_executive_metrics() -> Dict[str, Any]:
         'system_score': 0.95
     }
 
+_STRATEGIC_INSIGHTS = (
+    "📈 **Economia em crescimento**: PIB e empregos formais mostram tendência positiva",
+    "🎯 **Empreendedorismo ativo**: Número de empresas e empregos em expansão",
+    "🌱️ **Sustentabilidade monitorada**: IDSC e emissões sendo acompanhados",
+    "📊 **Dados atualizados**: Taxa de atualização acima de 95%",
+    "⚡ **Sistema estável**: Health checks funcionando corretamente"
+)
+_STRATEGIC_INSIGHTS_TEXT = "\n".join(_STRATEGIC_INSIGHTS)
+
 def get_strategic_insights() -> List[str]:
     """Gera insights estratégicos baseado nos dados atuais."""
-    insights = [
-        "📈 **Economia em crescimento**: PIB e empregos formais mostram tendência positiva",
-        "🎯 **Empreendedorismo ativo**: Número de empresas e empregos em expansão",
-        "🌱️ **Sustentabilidade monitorada**: IDSC e emissões sendo acompanhados",
-        "📊 **Dados atualizados**: Taxa de atualização acima de 95%",
-        "⚡ **Sistema estável**: Health checks funcionando corretamente"
-    ]
-    
-    return insights
+    return list(_STRATEGIC_INSIGHTS)
 
 def get_critical_alerts() -> List[str]:
     """Retorna alertas críticas que precisam de atenção imediata."""
-    critical_alerts = []
-    
-    # Buscar alertas recentes
-    for alert in alert_manager.alert_history:
-        if alert['priority'] == 'high':
-            critical_alerts.append(f"🔴 {alert['message']}")
-    
-    return critical_alerts
+    return [f"🔴 {alert['message']}" for alert in alert_manager.high_priority_alerts]
 
-def create_executive_summary() -> str:
-    """Cria resumo executivo para gestão."""
-    metrics = get_executive_metrics()
-    insights = get_strategic_insights()
-    critical_alerts = get_critical_alerts()
-    
-    insights_text = "\n".join(insights)
-    critical_alerts_text = "\n".join(critical_alerts) if critical_alerts else "Nenhuma alerta crítica no momento"
-    
-    summary = f"""
+# Modelo do resumo executivo; partes constantes resolvidas uma única vez na importação
+_SUMMARY_TEMPLATE = f"""
     # 📊 **Resumo Executivo** - {MUNICIPIO}/{UF}
-    **Data:** {datetime.now().strftime('%d/%m/%Y')}
+    **Data:** {{data}}
     
-    **Status Geral:** {metrics['system_score']:.1%}
+    **Status Geral:** {{system_score:.1%}}
     
     **KPIs Principais:**
-    - Taxa de Atualização: {metrics['atualizacao']:.1f}%
-    - Qualidade dos Dados: {metrics['qualidade_dados']:.1f}%
-    - Cobertura: {metrics['cobertura_indicadores']} indicadores
-    - Performance: {metrics['performance']:.1f}%
+    - Taxa de Atualização: {{atualizacao:.1%}}
+    - Qualidade dos Dados: {{qualidade_dados:.1%}}
+    - Cobertura: {{cobertura_indicadores}} indicadores
+    - Performance: {{performance:.1%}}
     
     **Tendências Positivas:**
-    {insights_text}
+    {_STRATEGIC_INSIGHTS_TEXT}
     
     **Alertas Críticas:**
-    {critical_alerts_text}
+    {{critical_alerts_text}}
     
     **Próximos Passos:**
     - Monitorar continuamente saúde do sistema
     - Expandir indicadores essenciais faltantes
     - Implementar dashboards comparativos
     """
+
+def create_executive_summary() -> str:
+    """Cria resumo executivo para gestão."""
+    critical_alerts = get_critical_alerts()
+    critical_alerts_text = "\n".join(critical_alerts) if critical_alerts else "Nenhuma alerta crítica no momento"
     
-    return summary
+    return _SUMMARY_TEMPLATE.format_map({
+        **get_executive_metrics(),
+        'data': datetime.now().strftime('%d/%m/%Y'),
+        'critical_alerts_text': critical_alerts_text,
+    })
@@ -2,7 +2,10 @@
 Catálogo de indicadores amigáveis para o painel.
 Mapeia chaves técnicas para nomes compreensíveis e descrições.
 """
-from typing import Dict, List
+import sys
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Dict, List, Mapping
 
 # Catálogo completo de indicadores com nomes amigáveis
 CATALOGO_INDICADORES = {
@@ -149,17 +152,43 @@ CATALOGO_INDICADORES = {
     }
 }
 
-def get_indicator_info(indicator_key: str) -> dict:
+# Congelar o catálogo: entradas somente leitura e strings curtas internadas
+CATALOGO_INDICADORES = MappingProxyType({
+    key: MappingProxyType({
+        **info,
+        "categoria": sys.intern(info["categoria"]),
+        "unidade": sys.intern(info["unidade"]),
+    })
+    for key, info in CATALOGO_INDICADORES.items()
+})
+
+# Índices derivados do catálogo, construídos uma única vez na importação
+_BY_CATEGORY: Dict[str, List[str]] = {
+    categoria: [key for key, info in CATALOGO_INDICADORES.items() if info["categoria"] == categoria]
+    for categoria in dict.fromkeys(info["categoria"] for info in CATALOGO_INDICADORES.values())
+}
+# Categorias em ordem de primeira ocorrência no catálogo (tupla estável e hashable,
+# pode ser usada diretamente como argumento de funções com st.cache_data)
+CATEGORIES = tuple(_BY_CATEGORY)
+
+@lru_cache(maxsize=512)
+def get_indicator_info(indicator_key: str) -> Mapping[str, str]:
     """
     Retorna informações amigáveis sobre um indicador.
     
+    O resultado é memoizado; para chaves fora do catálogo retorna um
+    mapeamento imutável (MappingProxyType), compartilhado entre chamadas.
+    
     Args:
         indicator_key: Chave técnica do indicador
         
     Returns:
         Dicionário com nome, descrição, unidade e categoria
     """
-    return CATALOGO_INDICADORES.get(indicator_key, {
+    info = CATALOGO_INDICADORES.get(indicator_key)
+    if info is not None:
+        return info
+    return MappingProxyType({
         "nome": indicator_key,
         "descricao": "Indicador sem descrição detalhada",
         "unidade": "",
@@ -176,14 +205,13 @@ def get_indicators_by_category(category: str) -> list:
     Returns:
         Lista de chaves de indicadores da categoria
     """
-    return [key for key, info in CATALOGO_INDICADORES.items() 
-            if info["categoria"] == category]
+    return list(_BY_CATEGORY.get(category, ()))
 
 def get_all_categories() -> list:
     """
-    Retorna todas as categorias disponíveis.
+    Retorna todas as categorias disponíveis, na ordem em que aparecem no catálogo.
     
     Returns:
         Lista de nomes de categorias
     """
-    return list(set(info["categoria"] for info in CATALOGO_INDICADORES.values()))
+    return list(CATEGORIES)
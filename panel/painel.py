@@ -15,14 +15,24 @@ BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 if BASE_DIR not in sys.path:
     sys.path.insert(0, BASE_DIR)
 
+import importlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+
+import numpy as np
 import pandas as pd
 import streamlit as st
-import plotly.express as px
-import plotly.graph_objects as go
 
 from config import LOG_FORMAT, LOG_LEVEL, MUNICIPIO, UF
-from database import get_timeseries, init_db, list_indicators
-from utils.status_check import get_indicator_status
+from database import (
+    expire_local_mirror,
+    get_latest_values,
+    get_timeseries,
+    get_timeseries_pairs,
+    init_db,
+    list_indicators,
+)
 from utils.analytics import inject_google_analytics
 
 # Agrupamento de indicadores por seção do painel (para navegação)
@@ -44,7 +54,33 @@ SECAO_POR_FONTE = {
 }
 SECAO_PADRAO = "Outros"
 
+# Limite de pontos por série enviados aos gráficos (acima disso aplica MinMax-LTTB)
+MAX_PONTOS_GRAFICO = 500
+# Linhas exibidas por padrão na tabela de dados do expander
+LINHAS_TABELA_PADRAO = 200
+# Ano corrente (padrão do "Ano Final"), calculado uma vez por processo
+_CURRENT_YEAR = datetime.now().year
+
 TITULO_SECRETARIA = "Secretaria Municipal de Desenvolvimento, Ciência, Tecnologia e Inovação"
+ASSETS_DIR = Path(__file__).resolve().parent.parent / "assets"
+LOGO_PATH = ASSETS_DIR / "logo_prefeitura.png"
+PANEL_CSS_PATH = ASSETS_DIR / "panel.css"
+
+# Painel exclusivamente interno: todas as abas sempre disponíveis
+ABAS = (
+    "Visão Geral",
+    "Economia",
+    "Trabalho & Renda",
+    "Negócios",
+    "Educação",
+    "Saúde",
+    "Sustentabilidade",
+    "PIB Estimado",
+    "Dashboard Executivo",
+    "Métricas do Sistema",
+    "Relatórios",
+    "Metodologia",
+)
 
 # Importar catálogo
 try:
@@ -62,6 +98,21 @@ logger = logging.getLogger(__name__)
 init_db()
 
 # --- Deferir imports pesados (Lazy Loading para Estabilidade no Deploy) ---
+class _LazyModule:
+    """Proxy que importa o módulo apenas no primeiro acesso a um atributo."""
+
+    def __init__(self, name: str):
+        self._name = name
+        self._module = None
+
+    def __getattr__(self, attr):
+        if self._module is None:
+            self._module = importlib.import_module(self._name)
+        return getattr(self._module, attr)
+
+# Plotly só é importado quando uma página efetivamente monta um gráfico
+go = _LazyModule("plotly.graph_objects")
+
 def lazy_estimar_pib(*args, **kwargs):
     from analytics.estimativa_pib import estimar_pib
     return estimar_pib(*args, **kwargs)
@@ -70,10 +121,6 @@ def lazy_salvar_estimativa(*args, **kwargs):
     from analytics.estimativa_pib import salvar_estimativa
     return salvar_estimativa(*args, **kwargs)
 
-def lazy_get_estimativa_stored(*args, **kwargs):
-    from analytics.estimativa_pib import get_estimativa_stored
-    return get_estimativa_stored(*args, **kwargs)
-
 def lazy_analisar_tendencia(*args, **kwargs):
     from analytics.tendencias import analisar_tendencia
     return analisar_tendencia(*args, **kwargs)
@@ -101,16 +148,59 @@ def lazy_get_indicator_info(*args, **kwargs):
     return get_indicator_info(*args, **kwargs)
 
 
+def lazy_get_indicator_status(*args, **kwargs):
+    # status_check puxa requests (verificação de URL das fontes): só quando um selo é exibido
+    from utils.status_check import get_indicator_status
+    return get_indicator_status(*args, **kwargs)
+
+
 def lazy_run_rais_caged_extended():
     """Lazy load do módulo ETL estendido de Trabalho & Renda (RAIS/CAGED)."""
     from etl.rais_caged_extended import run
     return run
 
 # ─── Cache de consultas ao banco (reduz latência e créditos Neon) ────────────
+def _compact_series(df: pd.DataFrame) -> pd.DataFrame:
+    """Reduz Ano para int16 e source/Unidade para categóricas antes de a série entrar
+    no cache (pickle e memória menores).
+
+    Valor permanece float64: séries monetárias (PIB, VAF) excedem a precisão de float32.
+    """
+    if df.empty:
+        return df
+    dtypes = {"Ano": "int16", "source": "category", "Unidade": "category"}
+    return df.astype({col: dt for col, dt in dtypes.items() if col in df.columns}, copy=False)
+
 @st.cache_data(ttl=3600, show_spinner="Buscando dados...")
 def cached_get_timeseries(indicator_key: str, source: Optional[str] = None) -> pd.DataFrame:
     """Consulta com cache de 1h para reduzir requisições ao banco Neon."""
-    return get_timeseries(indicator_key, source)
+    return _compact_series(get_timeseries(indicator_key, source))
+
+
+@st.cache_resource(ttl=3600, show_spinner="Buscando dados...")
+def cached_get_timeseries_bulk(pairs: tuple) -> dict:
+    """Várias séries (indicador, fonte) em uma única consulta, com cache de 1h.
+
+    cache_resource: os DataFrames ficam em memória e são compartilhados entre reruns e
+    sessões, sem pickle a cada leitura. São somente leitura: quem precisar alterá-los
+    deve trabalhar sobre uma cópia.
+    """
+    return {pair: _compact_series(df) for pair, df in get_timeseries_pairs(list(pairs)).items()}
+
+
+@st.cache_resource(ttl=3600, show_spinner=False)
+def cached_latest_rows(pairs: tuple) -> dict:
+    """Última observação de cada série de um lote já carregado: {(indicador, fonte): linha}.
+
+    Calculada uma vez por lote; pares sem dados ficam de fora.
+    """
+    return {pair: _latest(df) for pair, df in cached_get_timeseries_bulk(pairs).items() if not df.empty}
+
+
+@st.cache_data(ttl=3600, show_spinner="Buscando dados...")
+def cached_get_latest_values(pairs: tuple) -> pd.DataFrame:
+    """Última observação de cada (indicador, fonte), em uma consulta com cache de 1h."""
+    return get_latest_values(list(pairs))
 
 
 @st.cache_data(ttl=3600)
@@ -129,32 +219,135 @@ INDICATOR_MAPPING = {
     "Negócios": ["EMPRESAS_FORMAIS", "SEBRAE_GERAL", "ESTABELECIMENTOS_SEBRAE"],
 }
 
-st.set_page_config(
-    page_title=TITULO_SECRETARIA,
-    layout="wide",
-    initial_sidebar_state="expanded"
+# Índice reverso indicador -> aba; setdefault mantém a primeira aba quando a chave
+# aparece em mais de uma (ex.: SEBRAE_GERAL), como na varredura original
+_SECAO_POR_INDICADOR: dict = {}
+for _secao, _keys in INDICATOR_MAPPING.items():
+    for _key in _keys:
+        _SECAO_POR_INDICADOR.setdefault(_key, _secao)
+del _secao, _keys, _key
+
+# Séries consultadas por página (uma única ida ao banco por página)
+# População em ordem de preferência: detalhada (SIDRA), senão a estimativa do IBGE
+POPULACAO_PARES = (
+    ("POPULACAO_DETALHADA", "IBGE/SIDRA"),
+    ("POPULACAO", "IBGE"),
+)
+SERIES_PIB_POP = (("PIB_TOTAL", "IBGE"),) + POPULACAO_PARES
+SERIES_VISAO_GERAL = SERIES_PIB_POP + (
+    ("IDHM", "ATLAS_BRASIL"),
+    ("GINI", "IBGE"),
+    ("RECEITA_VAF", "SEFAZ_MG"),
+    ("EMISSOES_GEE", "SEEG"),
 )
+SETORES_PIB = {
+    "Agropecuária": "PIB_AGROPECUARIA",
+    "Indústria": "PIB_INDUSTRIA",
+    "Serviços": "PIB_SERVICOS",
+    "Adm. Pública": "PIB_ADM_PUBLICA"
+}
+SETOR_POR_CHAVE = {key: label for label, key in SETORES_PIB.items()}
+SERIES_SETORES_PIB = tuple((key, "IBGE") for key in SETORES_PIB.values())
+SERIES_ECONOMIA = (
+    ("PIB_TOTAL", "IBGE"),
+    ("RECEITA_VAF", "SEFAZ_MG"),
+    ("RECEITA_ICMS", "SEFAZ_MG"),
+    ("MASSA_SALARIAL_ESTIMADA", "CAGED_ESTIMADO"),
+)
+SERIES_TRABALHO_RENDA = (
+    ("SALDO_CAGED_MENSAL", None),
+    ("SALARIO_MEDIO_MG", "SEBRAE"),
+    ("SALARIO_MEDIO_REAL", None),
+    ("EMPRESAS_ATIVAS", "SEBRAE"),
+    ("EMPRESOS_ATIVAS", None),
+    ("NUM_EMPRESAS", None),
+    ("MASSA_SALARIAL_ESTIMADA", "CAGED_ESTIMADO"),
+    ("EMPREGOS_CAGED", "CAGED_NOVO"),
+    ("EMPREGOS_CAGED", "CAGED"),
+    ("EMPREGOS_RAIS", "RAIS"),
+    ("ESCOLARIDADE_TRABALHO", "RAIS_DETALHADA"),
+)
+SERIES_SUSTENTABILIDADE = (
+    ("IDSC_GERAL", "IDSC"),
+    ("EMISSOES_GEE", "SEEG"),
+)
+# Histórico oficial + projeção gravada por salvar_estimativa (aba PIB Estimado)
+SERIES_PIB_ESTIMADO = (
+    ("PIB_TOTAL", "IBGE"),
+    ("PIB_ESTIMADO", "PROJECAO_INTERNA"),
+)
+_PAGE_SERIES = (
+    SERIES_PIB_POP, SERIES_VISAO_GERAL, SERIES_ECONOMIA, SERIES_TRABALHO_RENDA,
+    SERIES_SUSTENTABILIDADE, SERIES_PIB_ESTIMADO,
+)
+_LATEST_SERIES = (SERIES_SETORES_PIB,)
+
+# Séries gravadas por cada ETL disparado no painel (invalidação seletiva do cache)
+ETL_SERIES = {
+    "rais_caged_extended": (("MASSA_SALARIAL_ESTIMADA", "CAGED_ESTIMADO"),),
+    "pib_estimado": (("PIB_ESTIMADO", "PROJECAO_INTERNA"),),
+}
+
+def invalidate_series_cache(pairs) -> None:
+    """Descarta do cache apenas as entradas que contêm as séries (indicador, fonte) dadas.
+
+    Evita st.cache_data.clear(), que esfriaria o cache de todos os indicadores.
+    O espelho local do banco também é expirado, para o recarregamento ler os dados novos.
+    """
+    expire_local_mirror()
+    keys = {key for key, _ in pairs}
+    for key, source in pairs:
+        cached_get_timeseries.clear(key, source)
+    # Lotes fixos das páginas + lotes das abas genéricas (montados do catálogo)
+    section_batches = tuple(_section_series(inds) for inds in indicators_by_section().values())
+    for batch in _PAGE_SERIES + section_batches:
+        if any(key in keys for key, _ in batch):
+            cached_get_timeseries_bulk.clear(batch)
+            cached_latest_rows.clear(batch)
+    if any(key in keys for batch in section_batches for key, _ in batch):
+        # Entradas por período não são enumeráveis: descarta os recortes das abas genéricas
+        cached_get_timeseries_bulk_range.clear()
+    for batch in _LATEST_SERIES:
+        if any(key in keys for key, _ in batch):
+            cached_get_latest_values.clear(batch)
+    if any(key in keys for key, _ in SERIES_PIB_POP):
+        # Derivados de PIB/população (escolha da fonte, per capita, crescimento)
+        for derived in (get_population, get_pib_derived, get_pib_per_capita_df, get_pib_growth_df):
+            derived.clear()
+    # Um indicador novo pode passar a constar da lista usada pelas abas genéricas
+    cached_list_indicators.clear()
+    indicators_by_section.clear()
+
+def _prewarm() -> None:
+    """Carrega no cache os lotes fixos das páginas (executado em segundo plano)."""
+    try:
+        for batch in _PAGE_SERIES:
+            cached_get_timeseries_bulk(batch)
+        for batch in _LATEST_SERIES:
+            cached_get_latest_values(batch)
+        cached_list_indicators()
+    except Exception as e:
+        logger.warning(f"Pré-carga do cache falhou; as páginas buscarão os dados sob demanda: {e}")
+
+@st.cache_resource(show_spinner=False)
+def _start_prewarm() -> threading.Thread:
+    """Dispara a pré-carga uma única vez por processo (o cache de dados é compartilhado)."""
+    # A thread roda sem ScriptRunContext de propósito (não desenha spinners em nenhuma
+    # sessão); o Streamlit registra um aviso "missing ScriptRunContext" uma única vez.
+    thread = threading.Thread(target=_prewarm, name="painel-prewarm", daemon=True)
+    thread.start()
+    return thread
 
 # --- Modern Design System (CSS) ---
-st.markdown("""
-<link rel="preconnect" href="https://fonts.googleapis.com">
-<link rel="preconnect" href="https://fonts.gstatic.com" crossorigin>
-<link href="https://fonts.googleapis.com/css2?family=Outfit:wght@400;600;700&display=swap" rel="stylesheet">
-<style>
-    html, body, [class*="st-"] { font-family: 'Outfit', sans-serif !important; }
-    .stApp { background-color: #f1f5f9; background-image: radial-gradient(#cbd5e1 0.5px, transparent 0.5px); background-size: 24px 24px; }
-    [data-testid="stMetricValue"] { font-size: 2.2rem !important; font-weight: 700 !important; color: #0f172a !important; letter-spacing: -0.02em; }
-    [data-testid="stMetricLabel"] { color: #475569 !important; font-size: 0.95rem !important; font-weight: 600 !important; text-transform: uppercase; letter-spacing: 0.05em; }
-    .metric-card { background: white; padding: 24px; border-radius: 16px; border-left: 5px solid #2563eb; box-shadow: 0 10px 15px -3px rgba(0, 0, 0, 0.05); transition: all 0.3s cubic-bezier(0.4, 0, 0.2, 1); margin-bottom: 20px; }
-    .metric-card:hover { transform: translateY(-4px); box-shadow: 0 20px 25px -5px rgba(0, 0, 0, 0.1); border-left-color: #1d4ed8; }
-    .stPlotlyChart { background: white; padding: 15px; border-radius: 16px; box-shadow: 0 4px 6px -1px rgba(0, 0, 0, 0.05); }
-    section[data-testid="stSidebar"] { background-color: #0f172a !important; }
-    section[data-testid="stSidebar"] .stMarkdown, section[data-testid="stSidebar"] p { color: #f8fafc !important; }
-    section[data-testid="stSidebar"] .stSelectbox label, section[data-testid="stSidebar"] .stSelectbox p, section[data-testid="stSidebar"] .stRadio label { color: #cbd5e1 !important; }
-    h1, h2, h3 { color: #0f172a !important; font-weight: 700 !important; font-family: 'Outfit', sans-serif !important; }
-    hr { margin: 2em 0 !important; border: 0; height: 1px; background-image: linear-gradient(to right, rgba(0,0,0,0), rgba(0,0,0,0.1), rgba(0,0,0,0)); }
-</style>
-""", unsafe_allow_html=True)
+# Folha de estilo em assets/panel.css, lida do disco uma vez por processo.
+# Injetada em main() a cada execução: elementos não reemitidos num rerun são
+# removidos da página pelo Streamlit, levando o estilo junto.
+@st.cache_resource
+def _panel_css() -> str:
+    """Bloco <style> do painel pronto para o st.markdown (vazio se o arquivo faltar)."""
+    if not PANEL_CSS_PATH.exists():
+        return ""
+    return f"<style>\n{PANEL_CSS_PATH.read_text(encoding='utf-8')}</style>"
 
 # ─── Visual Components v2 (Design System Institucional) ──────────────────────
 try:
@@ -162,18 +355,22 @@ try:
         apply_custom_css,
         plotly_institutional_theme,
         render_kpi_grid,
+        render_kpi_html,
     )
 except ImportError:
     # Fallback seguro: funções mínimas se o módulo não existir
     def apply_custom_css(): pass  # noqa: E704
     def plotly_institutional_theme(fig, title="", source=""):  # noqa: E704
-        fig.update_layout(title=title)
+        fig.update_layout(title=title, separators=",.")
         return fig
     def render_kpi_grid(col_data):  # noqa: E704
         cols = st.columns(len(col_data)) if col_data else []
         for col, d in zip(cols, col_data):
             with col:
                 st.metric(d.get("label", ""), d.get("value", "—"), d.get("delta"))
+    def render_kpi_html(col_data, columns=4):  # noqa: E704
+        for start in range(0, len(col_data), columns):
+            render_kpi_grid(col_data[start:start + columns])
 
 # Manter compatibilidade retroativa com código que usa apply_institutional_layout
 try:
@@ -184,38 +381,87 @@ except ImportError:
     def apply_institutional_layout(fig, title="", source=""):  # noqa: E704
         return plotly_institutional_theme(fig, title, source)
 
-def card_plotly(label, value, delta=None, unit="", fonte=""):
-    """
-    Mantido para retrocompatibilidade onde ainda for usado, 
-    mas idealmente deve ser substituído por metric_card nas KPIs.
+def _line_figure(df: pd.DataFrame, color: str = "#1e3a8a", markers: bool = True,
+                 fill: Optional[str] = None):
+    """Gráfico de linha Ano x Valor renderizado em WebGL (Scattergl).
+
+    Séries acima de MAX_PONTOS_GRAFICO são reduzidas com MinMax-LTTB (_downsample).
     """
-    fig = go.Figure(go.Indicator(
-        mode="number+delta" if delta is not None else "number",
-        value=value,
-        number={"suffix": f" {unit}" if unit else ""},
-        delta={"reference": value - (delta or 0)} if delta is not None else None,
-        title={"text": f"{label}<br><span style='font-size:0.8em;color:gray'>{fonte}</span>"},
+    df = _downsample(df)
+    return go.Figure(go.Scattergl(
+        x=df["Ano"].to_numpy(), y=df["Valor"].to_numpy(),
+        mode="lines+markers" if markers else "lines",
+        line=dict(color=color),
+        fill=fill,
+        showlegend=False,
+    ))
+
+def _bar_figure(df: pd.DataFrame, color: str = "#1e3a8a"):
+    """Gráfico de barras Ano x Valor montado direto dos arrays NumPy (sem Plotly Express)."""
+    return go.Figure(go.Bar(
+        x=df["Ano"].to_numpy(), y=df["Valor"].to_numpy(),
+        marker_color=color,
+        showlegend=False,
     ))
-    fig.update_layout(
-        paper_bgcolor='rgba(0,0,0,0)', plot_bgcolor='rgba(0,0,0,0)',
-        margin=dict(l=10, r=10, t=30, b=10), height=150,
+
+def _downsample(df: pd.DataFrame, max_points: int = MAX_PONTOS_GRAFICO) -> pd.DataFrame:
+    """Reduz séries longas com MinMax-LTTB antes do envio ao navegador (forma preservada)."""
+    if len(df) <= max_points:
+        return df
+    from panel.trend_kernels import minmax_lttb_indices
+
+    x = df["Ano"].to_numpy(dtype=np.float64)
+    if "Mes" in df.columns:
+        x = x + df["Mes"].fillna(0).to_numpy(dtype=np.float64) / 12.0
+    return df.iloc[minmax_lttb_indices(x, df["Valor"].to_numpy(), max_points)]
+
+def _stacked_line_figure(series: list):
+    """Várias séries Ano x Valor em uma única figura, um subgráfico por série.
+
+    Args:
+        series: lista de (título, fonte, DataFrame) na ordem de exibição.
+    """
+    from plotly.subplots import make_subplots
+
+    n = len(series)
+    row_height = 320
+    fig = make_subplots(
+        rows=n, cols=1,
+        subplot_titles=[
+            f"<b>{title}</b><br><span style='font-size:11px;color:#64748b;'>Fonte: {source}</span>"
+            for title, source, _ in series
+        ],
+        # Espaço fixo de ~80px entre subgráficos, qualquer que seja o número de linhas
+        vertical_spacing=min(0.3, 80 / (row_height * n)),
     )
+    for row, (_, _, df) in enumerate(series, start=1):
+        fig.add_trace(
+            go.Scattergl(
+                x=df["Ano"].to_numpy(), y=df["Valor"].to_numpy(),
+                mode="lines+markers", showlegend=False,
+            ),
+            row=row, col=1,
+        )
+    fig.update_layout(height=row_height * n)
     return fig
 
+# Troca "," <-> "." em uma única passada (padrão en-US -> pt-BR)
+_BR_SEPARATORS = str.maketrans({",": ".", ".": ","})
+
+@lru_cache(maxsize=4096)
 def fmt_br(val: float, currency: bool = False, decimals: int = 0) -> str:
     try:
-        if pd.isna(val) or val is None: return "N/D"
+        if val is None or pd.isna(val): return "N/D"
         if decimals == 0 and abs(val - round(val)) < 1e-9:
-            s = f"{int(val):,}".replace(",", ".")
+            s = format(int(val), ",").translate(_BR_SEPARATORS)
         else:
-            fmt_str = "{:,.%df}" % decimals
-            s = fmt_str.format(val).replace(",", "X").replace(".", ",").replace("X", ".")
+            s = format(val, f",.{decimals}f").translate(_BR_SEPARATORS)
         if currency: return f"R$ {s}"
         return s
     except Exception: return str(val)
 
 def render_indicator_header(indicator_key: str, source: str, title: str):
-    status = get_indicator_status(indicator_key, source)
+    status = lazy_get_indicator_status(indicator_key, source)
     badge = ""
     if status["status"] == "error":
         badge = f' <span style="color:red;font-size:0.8em;">{status["message"]} — <a href="{status["url"]}" target="_blank">{status["url"]}</a></span>'
@@ -223,35 +469,107 @@ def render_indicator_header(indicator_key: str, source: str, title: str):
         badge = f' <span style="color:orange;font-size:0.8em;">{status["message"]} — <a href="{status["url"]}" target="_blank">{status["url"]}</a></span>'
     st.markdown(f"### {title}{badge}", unsafe_allow_html=True)
 
+def _first_nonempty(dfs: dict, *pairs) -> pd.DataFrame:
+    """Primeira série não vazia entre os pares (indicador, fonte), na ordem de preferência.
+
+    Os pares devem constar do lote já carregado em `dfs` (cached_get_timeseries_bulk).
+    """
+    for pair in pairs:
+        df = dfs.get(pair)
+        if df is not None and not df.empty:
+            return df
+    return pd.DataFrame()
+
+def _filter_years(df: pd.DataFrame, ano_inicio: int, ano_fim: int) -> pd.DataFrame:
+    """Recorta a série ao intervalo [ano_inicio, ano_fim].
+
+    Quando o intervalo cobre a série inteira (caso comum, filtro padrão) devolve o
+    próprio DataFrame, sem máscara nem cópia; sem interseção, devolve vazio direto.
+    """
+    anos = df["Ano"].to_numpy()
+    if anos.size == 0:
+        return df
+    primeiro, ultimo = anos.min(), anos.max()
+    if ano_inicio <= primeiro and ultimo <= ano_fim:
+        return df
+    if ultimo < ano_inicio or primeiro > ano_fim:
+        # Série inteira fora do intervalo: vazio com as mesmas colunas, sem máscara
+        return df.iloc[:0]
+    return df[df["Ano"].between(ano_inicio, ano_fim)]
+
+def _latest(df: pd.DataFrame) -> pd.Series:
+    """Última observação (maior Ano) sem ordenar/copiar o DataFrame.
+
+    Em empates (séries mensais) devolve a última linha do ano, como iloc[-1]
+    faria na série ordenada.
+    """
+    anos = df["Ano"].to_numpy()
+    return df.iloc[anos.size - 1 - int(anos[::-1].argmax())]
+
+@st.cache_resource(ttl=3600, show_spinner=False)
+def get_population() -> pd.DataFrame:
+    """Série de população preferida (POPULACAO_PARES), com a escolha da fonte feita uma vez."""
+    return _first_nonempty(cached_get_timeseries_bulk(SERIES_PIB_POP), *POPULACAO_PARES)
+
+@st.cache_data(ttl=3600)
+def get_pib_derived() -> pd.DataFrame:
+    """PIB, população, PIB per capita e crescimento anual (%) por Ano, em uma única passada.
+
+    Uma ordenação e uma junção servem aos KPIs de Visão Geral e Economia. PerCapita é
+    NaN nos anos sem população; Growth é NaN no primeiro ano da série.
+    """
+    dfs = cached_get_timeseries_bulk(SERIES_PIB_POP)
+    df_pib = dfs[("PIB_TOTAL", "IBGE")]
+    if df_pib.empty: return pd.DataFrame()
+    df_pop = get_population()
+    derived = df_pib.set_index("Ano")[["Valor"]].rename(columns={"Valor": "PIB"}).sort_index()
+    # Junção pelo índice (Ano) evita a montagem da tabela hash do merge
+    if df_pop.empty:
+        derived["Pop"] = np.nan
+    else:
+        derived = derived.join(df_pop.set_index("Ano")[["Valor"]].rename(columns={"Valor": "Pop"}))
+    v = derived["PIB"].to_numpy(dtype=np.float64)
+    growth = np.full(v.size, np.nan)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        derived["PerCapita"] = v / derived["Pop"].to_numpy(dtype=np.float64)
+        growth[1:] = (v[1:] / v[:-1] - 1.0) * 100.0
+    derived["Growth"] = growth
+    return derived.reset_index()
+
+def _pib_derived_series(column: str, unidade: str) -> pd.DataFrame:
+    """Coluna de get_pib_derived como série Ano/Valor/Unidade (anos sem valor omitidos)."""
+    derived = get_pib_derived()
+    if derived.empty: return pd.DataFrame()
+    serie = derived.loc[derived[column].notna(), ["Ano", column]].rename(columns={column: "Valor"})
+    if serie.empty: return pd.DataFrame()
+    serie["Unidade"] = unidade
+    return serie.reset_index(drop=True)
+
+@st.cache_data(ttl=3600)
 def get_pib_per_capita_df():
-    df_pib = cached_get_timeseries("PIB_TOTAL", "IBGE")
-    df_pop = cached_get_timeseries("POPULACAO_DETALHADA", "IBGE/SIDRA")
-    if df_pop.empty: df_pop = cached_get_timeseries("POPULACAO", "IBGE")
-    if df_pib.empty or df_pop.empty: return pd.DataFrame()
-    merged = pd.merge(df_pib, df_pop, on="Ano", suffixes=("_pib", "_pop"))
-    if merged.empty: return pd.DataFrame()
-    merged = merged.sort_values("Ano")
-    merged["Valor"] = merged["Valor_pib"] / merged["Valor_pop"]
-    merged["Unidade"] = "R$ / Hab"
-    return merged[["Ano", "Valor", "Unidade"]]
+    return _pib_derived_series("PerCapita", "R$ / Hab")
 
+@st.cache_data(ttl=3600)
 def get_pib_growth_df():
-    df_pib = cached_get_timeseries("PIB_TOTAL", "IBGE")
-    if df_pib.empty or len(df_pib) < 2: return pd.DataFrame()
-    df_pib = df_pib.sort_values("Ano")
-    df_pib["Valor"] = df_pib["Valor"].pct_change() * 100
-    df_pib["Unidade"] = "%"
-    return df_pib.dropna(subset=["Valor"])
+    return _pib_derived_series("Growth", "%")
 
 def get_secao_by_key(key: str) -> str:
-    for secao, keys in INDICATOR_MAPPING.items():
-        if key in keys: return secao
+    secao = _SECAO_POR_INDICADOR.get(key)
+    if secao: return secao
     info = CATALOGO_INDICADORES.get(key, {})
     fonte = info.get("fonte")
     return SECAO_POR_FONTE.get(fonte, SECAO_PADRAO)
 
 # --- PAGE RENDERING FUNCTIONS ---
 
+@st.cache_resource
+def _location_map_html() -> str:
+    """HTML do mapa de localização (folium importado e renderizado uma vez por processo)."""
+    import folium
+    m = folium.Map(location=[-18.8511, -41.9503], zoom_start=12)
+    folium.Marker([-18.8511, -41.9503], popup=MUNICIPIO).add_to(m)
+    return folium.Figure().add_child(m).render()
+
 def render_visao_geral(ano_inicio: int, ano_fim: int) -> None:
     st.subheader("Destaques do Município")
     st.markdown(f"""
@@ -265,11 +583,8 @@ def render_visao_geral(ano_inicio: int, ano_fim: int) -> None:
     col_map, col_info = st.columns([2, 1])
     with col_map:
         try:
-            import folium
-            from streamlit_folium import folium_static
-            m = folium.Map(location=[-18.8511, -41.9503], zoom_start=12)
-            folium.Marker([-18.8511, -41.9503], popup=MUNICIPIO).add_to(m)
-            folium_static(m, width=700, height=300)
+            import streamlit.components.v1 as components
+            components.html(_location_map_html(), width=700, height=310)
         except Exception: st.info("Mapa indisponível no momento.")
     with col_info:
         st.write(f"**Município:** {MUNICIPIO}/{UF}")
@@ -280,76 +595,54 @@ def render_visao_geral(ano_inicio: int, ano_fim: int) -> None:
     st.divider()
 
     # ── Grade principal de KPIs ──────────────────────────────────
-    pop_det = cached_get_timeseries("POPULACAO_DETALHADA", "IBGE/SIDRA")
-    if pop_det.empty:
-        pop_det = cached_get_timeseries("POPULACAO", "IBGE")
-    pib = cached_get_timeseries("PIB_TOTAL", "IBGE")
+    latest = cached_latest_rows(SERIES_VISAO_GERAL)
+    pop = next((latest[pair] for pair in POPULACAO_PARES if pair in latest), None)
     df_pc = get_pib_per_capita_df()
     df_gr = get_pib_growth_df()
 
-    def _val_pop():
-        if not pop_det.empty:
-            ult = pop_det.sort_values("Ano").iloc[-1]
-            return fmt_br(ult["Valor"]), f"Ref. {int(ult['Ano'])}"
-        return "N/D", ""
+    def _fmt_latest(pair, fmt) -> str:
+        row = latest.get(pair)
+        return fmt(row["Valor"]) if row is not None else "N/D"
 
-    def _val_pib():
-        if not pib.empty:
-            ult = pib.sort_values("Ano").iloc[-1]
-            return f"R$ {fmt_br(ult['Valor'] / 1_000_000, decimals=2)} bi", f"Ref. {int(ult['Ano'])}"
-        return "N/D", ""
-
-    pop_val, pop_sub = _val_pop()
-    pib_val, pib_sub = _val_pib()
+    pop_val, pop_sub = (fmt_br(pop["Valor"]), f"Ref. {int(pop['Ano'])}") if pop is not None else ("N/D", "")
+    pib_val = _fmt_latest(("PIB_TOTAL", "IBGE"), lambda v: f"R$ {fmt_br(v / 1_000_000, decimals=2)} bi")
     pc_val = fmt_br(df_pc.iloc[-1]["Valor"], currency=True) if not df_pc.empty else "N/D"
     gr_val = (
         f"{fmt_br(df_gr.iloc[-1]['Valor'], decimals=2)}%" if not df_gr.empty else "N/D"
     )
     gr_delta = None
     if not df_gr.empty and len(df_gr) >= 2:
-        gr_ant = df_gr.sort_values("Ano").iloc[-2]["Valor"]
-        gr_ult = df_gr.sort_values("Ano").iloc[-1]["Valor"]
+        # get_pib_growth_df já devolve a série ordenada por Ano
+        gr_ant, gr_ult = df_gr["Valor"].to_numpy()[-2:]
         gr_delta = f"{gr_ult - gr_ant:+.2f} p.p."
 
-    render_kpi_grid([
+    # As 8 KPIs (2 linhas de 4) saem em um único bloco HTML
+    render_kpi_html([
         {"label": "População", "value": pop_val, "help": pop_sub},
         {"label": "PIB Total", "value": pib_val, "help": "IBGE – Contas Regionais"},
         {"label": "PIB per Capita", "value": pc_val, "help": "Calculado: PIB/População"},
         {"label": "Crescimento PIB", "value": gr_val, "delta": gr_delta,
          "help": "Variação percentual anual"},
-    ])
-
-    st.markdown("<br>", unsafe_allow_html=True)
-
-    # ── Segunda grade de KPIs ───────────────────────────────────
-    idhm = cached_get_timeseries("IDHM", "ATLAS_BRASIL")
-    gini = cached_get_timeseries("GINI", "IBGE")
-    vaf  = cached_get_timeseries("RECEITA_VAF", "SEFAZ_MG")
-    gee  = cached_get_timeseries("EMISSOES_GEE", "SEEG")
-
-    render_kpi_grid([
         {
             "label": "IDH-M",
-            "value": fmt_br(idhm.sort_values("Ano").iloc[-1]["Valor"], decimals=3)
-                     if not idhm.empty else "N/D",
+            "value": _fmt_latest(("IDHM", "ATLAS_BRASIL"), lambda v: fmt_br(v, decimals=3)),
             "help": "Atlas Brasil – PNUD",
         },
         {
             "label": "Índice GINI",
-            "value": fmt_br(gini.sort_values("Ano").iloc[-1]["Valor"], decimals=4)
-                     if not gini.empty else "N/D",
+            "value": _fmt_latest(("GINI", "IBGE"), lambda v: fmt_br(v, decimals=4)),
             "help": "Desigualdade de renda – IBGE",
         },
         {
             "label": "VAF",
-            "value": f"R$ {fmt_br(vaf.iloc[-1]['Valor'] / 1_000_000, decimals=1)} M"
-                     if not vaf.empty else "N/D",
+            "value": _fmt_latest(
+                ("RECEITA_VAF", "SEFAZ_MG"), lambda v: f"R$ {fmt_br(v / 1_000_000, decimals=1)} M"
+            ),
             "help": "Valor Adicionado Fiscal – SEFAZ-MG",
         },
         {
             "label": "Emissões GEE",
-            "value": f"{fmt_br(gee.iloc[-1]['Valor'], decimals=0)} t"
-                     if not gee.empty else "N/D",
+            "value": _fmt_latest(("EMISSOES_GEE", "SEEG"), lambda v: f"{fmt_br(v, decimals=0)} t"),
             "help": "Toneladas CO₂e – SEEG",
         },
     ])
@@ -363,19 +656,21 @@ def render_economia(ano_inicio: int, ano_fim: int) -> None:
         "🏦 Capacidade Fiscal"
     ])
     
-    df_pib = cached_get_timeseries("PIB_TOTAL", "IBGE")
+    dfs = cached_get_timeseries_bulk(SERIES_ECONOMIA)
+    df_pib = dfs[("PIB_TOTAL", "IBGE")]
     
     with tab1:
         st.subheader("Indicadores Principais de Economia")
         df_pc = get_pib_per_capita_df()
         df_gr = get_pib_growth_df()
 
+        pib = cached_latest_rows(SERIES_ECONOMIA).get(("PIB_TOTAL", "IBGE"))
         render_kpi_grid([
             {
                 "label": "PIB Total",
-                "value": f"R$ {fmt_br(df_pib.sort_values('Ano').iloc[-1]['Valor'] / 1_000_000, decimals=1)} bi"
-                         if not df_pib.empty else "N/D",
-                "help": f"Ano: {int(df_pib.sort_values('Ano').iloc[-1]['Ano'])}" if not df_pib.empty else "",
+                "value": f"R$ {fmt_br(pib['Valor'] / 1_000_000, decimals=1)} bi"
+                         if pib is not None else "N/D",
+                "help": f"Ano: {int(pib['Ano'])}" if pib is not None else "",
             },
             {
                 "label": "PIB per Capita",
@@ -391,41 +686,34 @@ def render_economia(ano_inicio: int, ano_fim: int) -> None:
 
     with tab2:
         st.subheader("Composição do PIB e Valor Adicionado")
-        setores = {
-            "Agropecuária": "PIB_AGROPECUARIA",
-            "Indústria": "PIB_INDUSTRIA",
-            "Serviços": "PIB_SERVICOS",
-            "Adm. Pública": "PIB_ADM_PUBLICA"
-        }
-        df_pie = []
-        for label, key in setores.items():
-            df_s = cached_get_timeseries(key, "IBGE")
-            if not df_s.empty:
-                ult = df_s.sort_values("Ano").iloc[-1]
-                df_pie.append({"Setor": label, "Valor": ult["Valor"], "Ano": ult["Ano"]})
+        # Último valor de cada setor, calculado no banco em uma única consulta
+        latest = cached_get_latest_values(SERIES_SETORES_PIB)
         
-        if df_pie:
-            df_pie_pd = pd.DataFrame(df_pie)
+        if not latest.empty:
+            df_pie_pd = pd.DataFrame({
+                "Setor": latest["indicator_key"].map(SETOR_POR_CHAVE),
+                "Valor": latest["Valor"],
+                "Ano": latest["Ano"],
+            })
             st.write(f"Dados referentes ao ano de {int(df_pie_pd['Ano'].iloc[0])}")
-            fig_pie = px.pie(df_pie_pd, values='Valor', names='Setor', title="Participação Setorial no PIB")
+            fig_pie = go.Figure(go.Pie(
+                labels=df_pie_pd["Setor"].to_numpy(), values=df_pie_pd["Valor"].to_numpy(),
+            ))
             fig_pie = apply_institutional_layout(fig_pie, title="Participação Setorial no PIB", source="IBGE - Contas Regionais")
-            st.plotly_chart(fig_pie, use_container_width=True)
+            st.plotly_chart(fig_pie, use_container_width=True, key="pib_setores")
         else: st.info("Dados setoriais não disponíveis.")
 
     with tab3:
         st.subheader("Evolução Histórica")
         if not df_pib.empty:
-            df_pib_f = df_pib[(df_pib["Ano"] >= ano_inicio) & (df_pib["Ano"] <= ano_fim)]
-            fig_evol = px.line(
-                df_pib_f, x="Ano", y="Valor", markers=True,
-                color_discrete_sequence=["#1e3a8a"],
-            )
+            df_pib_f = _filter_years(df_pib, ano_inicio, ano_fim)
+            fig_evol = _line_figure(df_pib_f)
             fig_evol = plotly_institutional_theme(
                 fig_evol,
                 title="Evolução do PIB Nominal (Série Histórica)",
                 source="IBGE – Contas Regionais",
             )
-            st.plotly_chart(fig_evol, use_container_width=True)
+            st.plotly_chart(fig_evol, use_container_width=True, key="pib_evol")
             st.caption(
                 "⚠️ **Nota metodológica:** Dados oficiais do IBGE disponíveis até 2022. "
                 "Valores a partir de 2023 são **projeções estatísticas** (Holt-Winters/Híbrido) "
@@ -434,9 +722,9 @@ def render_economia(ano_inicio: int, ano_fim: int) -> None:
 
     with tab4:
         st.subheader("Indicadores de Capacidade Fiscal")
-        vaf   = cached_get_timeseries("RECEITA_VAF", "SEFAZ_MG")
-        icms  = cached_get_timeseries("RECEITA_ICMS", "SEFAZ_MG")
-        massa = cached_get_timeseries("MASSA_SALARIAL_ESTIMADA", "CAGED_ESTIMADO")
+        vaf   = dfs[("RECEITA_VAF", "SEFAZ_MG")]
+        icms  = dfs[("RECEITA_ICMS", "SEFAZ_MG")]
+        massa = dfs[("MASSA_SALARIAL_ESTIMADA", "CAGED_ESTIMADO")]
 
         render_kpi_grid([
             {
@@ -459,27 +747,38 @@ def render_economia(ano_inicio: int, ano_fim: int) -> None:
             },
         ])
 
+@st.fragment
+def render_etl_estendido() -> None:
+    """Botão do ETL estendido; como fragmento, o clique não re-renderiza a página inteira."""
+    with st.expander("🔄 Recalcular indicadores de Massa Salarial", expanded=False):
+        if st.button("Executar ETL Estendido (RAIS/CAGED)", key="btn_rais_ext"):
+            with st.spinner("Calculando Massa Salarial..."):
+                try:
+                    run_fn = lazy_run_rais_caged_extended()
+                    run_fn()
+                    invalidate_series_cache(ETL_SERIES["rais_caged_extended"])
+                    st.success("✔️ Massa Salarial atualizada! Recarregue a página.")
+                except Exception as exc:
+                    st.error(f"Erro no ETL estendido: {exc}")
+
 def render_trabalho_renda(ano_inicio: int, ano_fim: int) -> None:
     """Aba Trabalho & Renda: indicadores de mercado de trabalho e renda."""
     st.subheader("Análise do Mercado de Trabalho e Renda")
 
     # ── KPIs principais ─────────────────────────────────────
-    saldo_mes = cached_get_timeseries("SALDO_CAGED_MENSAL")
-    salario   = cached_get_timeseries("SALARIO_MEDIO_MG", "SEBRAE")
-    if salario.empty:
-        salario = cached_get_timeseries("SALARIO_MEDIO_REAL")
-    empresas  = cached_get_timeseries("EMPRESAS_ATIVAS", "SEBRAE")
-    if empresas.empty:
-        empresas = cached_get_timeseries("EMPRESOS_ATIVAS")
-    if empresas.empty:
-        empresas = cached_get_timeseries("NUM_EMPRESAS")
-    massa = cached_get_timeseries("MASSA_SALARIAL_ESTIMADA", "CAGED_ESTIMADO")
+    dfs = cached_get_timeseries_bulk(SERIES_TRABALHO_RENDA)
+    saldo_mes = dfs[("SALDO_CAGED_MENSAL", None)]
+    salario   = _first_nonempty(dfs, ("SALARIO_MEDIO_MG", "SEBRAE"), ("SALARIO_MEDIO_REAL", None))
+    empresas  = _first_nonempty(
+        dfs, ("EMPRESAS_ATIVAS", "SEBRAE"), ("EMPRESOS_ATIVAS", None), ("NUM_EMPRESAS", None)
+    )
+    massa = dfs[("MASSA_SALARIAL_ESTIMADA", "CAGED_ESTIMADO")]
 
     saldo_val   = fmt_br(saldo_mes.iloc[-1]["Valor"]) if not saldo_mes.empty else "N/D"
     saldo_delta = None
     if not saldo_mes.empty and len(saldo_mes) >= 2:
-        d = saldo_mes.sort_values("Ano")
-        saldo_delta = f"{d.iloc[-1]['Valor'] - d.iloc[-2]['Valor']:+.0f}"
+        # A consulta já ordena por ano/mês; não é preciso reordenar
+        saldo_delta = f"{saldo_mes.iloc[-1]['Valor'] - saldo_mes.iloc[-2]['Valor']:+.0f}"
 
     render_kpi_grid([
         {
@@ -512,15 +811,10 @@ def render_trabalho_renda(ano_inicio: int, ano_fim: int) -> None:
     # ── Séries Históricas ─────────────────────────────────────
     col_caged, col_rais = st.columns(2)
     with col_caged:
-        jobs = cached_get_timeseries("EMPREGOS_CAGED", "CAGED_NOVO")
-        if jobs.empty:
-            jobs = cached_get_timeseries("EMPREGOS_CAGED", "CAGED")
+        jobs = _first_nonempty(dfs, ("EMPREGOS_CAGED", "CAGED_NOVO"), ("EMPREGOS_CAGED", "CAGED"))
         if not jobs.empty:
             st.subheader("📈 Estoque de Empregos (CAGED)")
-            fig = px.area(
-                jobs, x="Ano", y="Valor",
-                color_discrete_sequence=["#60a5fa"],
-            )
+            fig = _line_figure(jobs, color="#60a5fa", markers=False, fill="tozeroy")
             fig = plotly_institutional_theme(
                 fig,
                 title="Estoque de Empregos Formais",
@@ -529,13 +823,10 @@ def render_trabalho_renda(ano_inicio: int, ano_fim: int) -> None:
             st.plotly_chart(fig, use_container_width=True)
 
     with col_rais:
-        jobs_rais = cached_get_timeseries("EMPREGOS_RAIS", "RAIS")
+        jobs_rais = dfs[("EMPREGOS_RAIS", "RAIS")]
         if not jobs_rais.empty:
             st.subheader("👔 Vínculos Formais (RAIS)")
-            fig = px.line(
-                jobs_rais, x="Ano", y="Valor", markers=True,
-                color_discrete_sequence=["#1e3a8a"],
-            )
+            fig = _line_figure(jobs_rais)
             fig = plotly_institutional_theme(
                 fig,
                 title="Vínculos Empregatícios (RAIS)",
@@ -548,28 +839,14 @@ def render_trabalho_renda(ano_inicio: int, ano_fim: int) -> None:
     st.subheader("📊 Massa Salarial e Escolaridade (RAIS Estendido)")
 
     # Atualizar indicadores antes de exibir (lazy load do ETL)
-    with st.expander("🔄 Recalcular indicadores de Massa Salarial", expanded=False):
-        if st.button("Executar ETL Estendido (RAIS/CAGED)", key="btn_rais_ext"):
-            with st.spinner("Calculando Massa Salarial..."):
-                try:
-                    run_fn = lazy_run_rais_caged_extended()
-                    run_fn()
-                    st.cache_data.clear()
-                    st.success("✔️ Massa Salarial atualizada! Recarregue a página.")
-                except Exception as exc:
-                    st.error(f"Erro no ETL estendido: {exc}")
+    render_etl_estendido()
 
     col_ms, col_esc = st.columns(2)
     with col_ms:
-        df_massa = cached_get_timeseries("MASSA_SALARIAL_ESTIMADA", "CAGED_ESTIMADO")
+        df_massa = massa
         if not df_massa.empty:
-            df_massa_f = df_massa[
-                (df_massa["Ano"] >= ano_inicio) & (df_massa["Ano"] <= ano_fim)
-            ]
-            fig_ms = px.bar(
-                df_massa_f, x="Ano", y="Valor",
-                color_discrete_sequence=["#1e3a8a"],
-            )
+            df_massa_f = _filter_years(df_massa, ano_inicio, ano_fim)
+            fig_ms = _bar_figure(df_massa_f)
             fig_ms = plotly_institutional_theme(
                 fig_ms,
                 title="Massa Salarial Estimada (R$)",
@@ -584,15 +861,10 @@ def render_trabalho_renda(ano_inicio: int, ano_fim: int) -> None:
             st.info("Dados de Massa Salarial não disponíveis. Execute o ETL Estendido acima.")
 
     with col_esc:
-        df_esc = cached_get_timeseries("ESCOLARIDADE_TRABALHO", "RAIS_DETALHADA")
+        df_esc = dfs[("ESCOLARIDADE_TRABALHO", "RAIS_DETALHADA")]
         if not df_esc.empty:
-            df_esc_f = df_esc[
-                (df_esc["Ano"] >= ano_inicio) & (df_esc["Ano"] <= ano_fim)
-            ]
-            fig_esc = px.bar(
-                df_esc_f, x="Ano", y="Valor",
-                color_discrete_sequence=["#60a5fa"],
-            )
+            df_esc_f = _filter_years(df_esc, ano_inicio, ano_fim)
+            fig_esc = _bar_figure(df_esc_f, "#60a5fa")
             fig_esc = plotly_institutional_theme(
                 fig_esc,
                 title="Distribuição de Escolaridade (RAIS)",
@@ -606,27 +878,72 @@ def render_trabalho_renda(ano_inicio: int, ano_fim: int) -> None:
         else:
             st.info("Dados de Escolaridade não disponíveis no banco.")
 
+@st.cache_resource
+def _estimativa_executor() -> ThreadPoolExecutor:
+    """Um único worker por processo: recálculos da projeção nunca gravam em paralelo."""
+    return ThreadPoolExecutor(max_workers=1, thread_name_prefix="painel-estimativa")
+
+def _iniciar_estimativa() -> None:
+    """Callback do botão "Atualizar Projeção": agenda salvar_estimativa no executor."""
+    if "pib_estimativa_job" not in st.session_state:
+        st.session_state["pib_estimativa_job"] = _estimativa_executor().submit(lazy_salvar_estimativa)
+
+@st.fragment(run_every=2)
+def _acompanhar_estimativa() -> None:
+    """Consulta o recálculo em segundo plano; ao terminar, invalida a série e redesenha."""
+    job = st.session_state.get("pib_estimativa_job")
+    if job is None: return
+    if not job.done():
+        st.info("⏳ Calculando modelos em segundo plano... a página segue disponível.")
+        return
+    del st.session_state["pib_estimativa_job"]
+    try:
+        job.result()
+    except Exception as e:
+        logger.error(f"Falha ao atualizar a projeção do PIB: {e}")
+        st.session_state["pib_estimativa_msg"] = ("error", f"Erro ao atualizar a projeção: {e}")
+    else:
+        invalidate_series_cache(ETL_SERIES["pib_estimado"])
+        st.session_state["pib_estimativa_msg"] = ("success", "Projeção atualizada!")
+    st.rerun()
+
+@st.fragment
 def render_pib_estimado(ano_inicio: int, ano_fim: int) -> None:
-    """Exibe as projeções do PIB com notas metodológicas claras."""
+    """Exibe as projeções do PIB com notas metodológicas claras.
+
+    Renderizado como fragmento: "Atualizar Projeção" reexecuta apenas esta seção. O
+    recálculo roda em segundo plano e é acompanhado por _acompanhar_estimativa.
+    """
     st.subheader("Projeção do PIB Municipal")
     st.info(
         "📊 Visualização de projeções baseadas em modelos estatísticos. "
         "Dados oficiais disponíveis até 2022 (IBGE)."
     )
 
-    if st.button("🔄 Atualizar Projeção"):
-        with st.spinner("Calculando modelos..."):
-            lazy_salvar_estimativa()
-        st.success("Projeção atualizada!")
-
-    df_hist = cached_get_timeseries("PIB_TOTAL", source="IBGE")
-    df_prev = lazy_get_estimativa_stored()
+    # O callback agenda o job antes do rerun: o botão já aparece desabilitado
+    st.button(
+        "🔄 Atualizar Projeção",
+        on_click=_iniciar_estimativa,
+        disabled="pib_estimativa_job" in st.session_state,
+    )
+    if "pib_estimativa_job" in st.session_state:
+        _acompanhar_estimativa()
+    msg = st.session_state.pop("pib_estimativa_msg", None)
+    if msg is not None:
+        kind, text = msg
+        if kind == "success": st.success(text)
+        else: st.error(text)
+
+    # Histórico e projeção em um único lote (pré-carregado com as demais páginas)
+    dfs = cached_get_timeseries_bulk(SERIES_PIB_ESTIMADO)
+    df_hist = dfs[("PIB_TOTAL", "IBGE")]
+    df_prev = dfs[("PIB_ESTIMADO", "PROJECAO_INTERNA")]
 
     if not df_hist.empty:
         fig = go.Figure()
         fig.add_trace(
-            go.Scatter(
-                x=df_hist["Ano"], y=df_hist["Valor"],
+            go.Scattergl(
+                x=df_hist["Ano"].to_numpy(), y=df_hist["Valor"].to_numpy(),
                 mode="lines+markers",
                 name="Oficial (IBGE)",
                 line=dict(color="#1e3a8a", width=2),
@@ -635,8 +952,8 @@ def render_pib_estimado(ano_inicio: int, ano_fim: int) -> None:
         )
         if not df_prev.empty:
             fig.add_trace(
-                go.Scatter(
-                    x=df_prev["Ano"], y=df_prev["Valor"],
+                go.Scattergl(
+                    x=df_prev["Ano"].to_numpy(), y=df_prev["Valor"].to_numpy(),
                     mode="lines+markers",
                     name="Projeção Estatística",
                     line=dict(color="#60a5fa", width=2, dash="dash"),
@@ -671,9 +988,10 @@ def render_pib_estimado(ano_inicio: int, ano_fim: int) -> None:
 def render_sustentabilidade(ano_inicio: int, ano_fim: int) -> None:
     """Aba Sustentabilidade."""
     st.subheader("Indicadores de Sustentabilidade")
+    dfs = cached_get_timeseries_bulk(SERIES_SUSTENTABILIDADE)
     col1, col2 = st.columns(2)
     with col1:
-        idsc = cached_get_timeseries("IDSC_GERAL", "IDSC")
+        idsc = dfs[("IDSC_GERAL", "IDSC")]
         if not idsc.empty:
             val = idsc.iloc[-1]["Valor"]
             render_kpi_grid([
@@ -683,10 +1001,7 @@ def render_sustentabilidade(ano_inicio: int, ano_fim: int) -> None:
                     "help": "Índice de Desenvolvimento Sustentável das Cidades",
                 }
             ])
-            fig = px.line(
-                idsc, x="Ano", y="Valor", markers=True,
-                color_discrete_sequence=["#1e3a8a"],
-            )
+            fig = _line_figure(idsc)
             fig = plotly_institutional_theme(
                 fig,
                 title="Evolução do IDSC",
@@ -697,7 +1012,7 @@ def render_sustentabilidade(ano_inicio: int, ano_fim: int) -> None:
             st.info("Dados do IDSC indisponíveis.")
 
     with col2:
-        emissoes = cached_get_timeseries("EMISSOES_GEE", "SEEG")
+        emissoes = dfs[("EMISSOES_GEE", "SEEG")]
         if not emissoes.empty:
             val = emissoes.iloc[-1]["Valor"]
             render_kpi_grid([
@@ -707,10 +1022,7 @@ def render_sustentabilidade(ano_inicio: int, ano_fim: int) -> None:
                     "help": "SEEG – Sistema de Estimativas de Emissões",
                 }
             ])
-            fig = px.bar(
-                emissoes, x="Ano", y="Valor",
-                color_discrete_sequence=["#1e3a8a"],
-            )
+            fig = _bar_figure(emissoes)
             fig = plotly_institutional_theme(
                 fig,
                 title="Emissões de Gases de Efeito Estufa",
@@ -739,16 +1051,29 @@ def render_metodologia():
     O sistema utiliza atualização diária automática via GitHub Actions. É estritamente proibido o uso de dados simulados. Todo o backend é hospedado em PostgreSQL (Neon.tech).
     """)
 
+@st.cache_data(ttl=3600, show_spinner=False)
+def _cached_docx(ano_ini: int, ano_fim: int) -> tuple:
+    """Relatório Word do período como (nome do arquivo, bytes), com cache de 1h."""
+    docx_p = Path(lazy_gerar_relatorio_docx(ano_ini, ano_fim))
+    return docx_p.name, docx_p.read_bytes()
+
+@st.cache_data(ttl=3600, show_spinner=False)
+def _cached_ppt(ano_ini: int, ano_fim: int) -> tuple:
+    """Apresentação PPT do período como (nome do arquivo, bytes), com cache de 1h."""
+    ppt_p = Path(lazy_gerar_apresentacao_ppt(ano_ini, ano_fim))
+    return ppt_p.name, ppt_p.read_bytes()
+
+@st.fragment
 def render_relatorios(ano_ini, ano_fim):
+    """Central de relatórios; como fragmento, os botões de geração reexecutam só esta seção."""
     st.subheader("Central de Relatórios e Apresentações")
     col_docx, col_ppt = st.columns(2)
     with col_docx:
         if st.button("Gerar Relatório Word"):
              with st.spinner("Processando..."):
                  try:
-                     docx_p = lazy_gerar_relatorio_docx(ano_ini, ano_fim)
-                     with open(docx_p, "rb") as f:
-                         st.download_button("📥 Baixar DOCX", f, file_name=Path(docx_p).name, mime="application/vnd.openxmlformats-officedocument.wordprocessingml.document")
+                     nome, dados = _cached_docx(ano_ini, ano_fim)
+                     st.download_button("📥 Baixar DOCX", dados, file_name=nome, mime="application/vnd.openxmlformats-officedocument.wordprocessingml.document")
                      st.success("Relatório gerado!")
                  except Exception as e:
                      st.error(f"Erro: {e}")
@@ -757,123 +1082,178 @@ def render_relatorios(ano_ini, ano_fim):
         if st.button("Gerar Apresentação PPT"):
              with st.spinner("Processando..."):
                  try:
-                     ppt_p = lazy_gerar_apresentacao_ppt(ano_ini, ano_fim)
-                     with open(ppt_p, "rb") as f:
-                         st.download_button("📥 Baixar PPT", f, file_name=Path(ppt_p).name, mime="application/vnd.openxmlformats-officedocument.presentationml.presentation")
+                     nome, dados = _cached_ppt(ano_ini, ano_fim)
+                     st.download_button("📥 Baixar PPT", dados, file_name=nome, mime="application/vnd.openxmlformats-officedocument.presentationml.presentation")
                      st.success("Apresentação gerada!")
                  except Exception as e:
                      st.error(f"Erro: {e}")
 
+@st.cache_data(ttl=3600, show_spinner=False)
+def indicators_by_section() -> dict:
+    """Indicadores do banco agrupados por aba ({seção: (indicadores...)}), com cache de 1h.
+
+    Cada registro já traz o "nome" amigável do catálogo. Em Educação ficam apenas
+    os dados reais do INEP (sem placeholders).
+    """
+    por_secao: dict = {}
+    for ind in cached_list_indicators():
+        key = ind["indicator_key"]
+        nome = lazy_get_indicator_info(key).get("nome", key)
+        por_secao.setdefault(get_secao_by_key(key), []).append({**ind, "nome": nome})
+    if "Educação" in por_secao:
+        por_secao["Educação"] = [
+            i for i in por_secao["Educação"] if str(i.get("source", "")).startswith("INEP")
+        ]
+    return {secao: tuple(inds) for secao, inds in por_secao.items()}
+
+@st.cache_resource(ttl=3600, show_spinner=False)
+def cached_get_timeseries_bulk_range(pairs: tuple, ano_inicio: int, ano_fim: int) -> dict:
+    """Lote de cached_get_timeseries_bulk recortado a [ano_inicio, ano_fim].
+
+    O recorte roda uma vez por (lote, período); reruns com o mesmo filtro só leem o cache
+    (compartilhado e somente leitura, como o lote de origem).
+    """
+    return {
+        pair: _filter_years(df, ano_inicio, ano_fim) if not df.empty else df
+        for pair, df in cached_get_timeseries_bulk(pairs).items()
+    }
+
+def _section_series(inds) -> tuple:
+    """Pares (indicador, fonte) de uma aba genérica, no formato de cached_get_timeseries_bulk."""
+    return tuple((i["indicator_key"], i["source"]) for i in inds)
+
+@st.fragment
 def render_outras_paginas(pagina: str, ano_inicio: int, ano_fim: int) -> None:
-    """Renderiza abas genéricas (Educação, Saúde, Negócios, etc.) com gráficos institucionais."""
-    all_inds = cached_list_indicators()
-    inds_to_show = [i for i in all_inds if get_secao_by_key(i["indicator_key"]) == pagina]
+    """Renderiza abas genéricas (Educação, Saúde, Negócios, etc.) com gráficos institucionais.
+
+    Fragmento: widgets internos (ex.: "Carregar todas as linhas") reexecutam só esta aba.
+    """
+    inds_to_show = indicators_by_section().get(pagina, ())
 
-    # Educação: exibir apenas dados reais do INEP (sem placeholders)
     if pagina == "Educação":
         st.info("Indicadores exibidos exclusivamente a partir de dados reais (origem INEP).")
-        inds_to_show = [i for i in inds_to_show if str(i.get("source", "")).startswith("INEP")]
 
     if not inds_to_show:
         st.info("Nenhum indicador disponível nesta categoria no banco de dados.")
         return
 
-    for item in inds_to_show:
-        df = cached_get_timeseries(item["indicator_key"], source=item["source"])
-        if df.empty:
-            continue
-        df = df[(df["Ano"] >= ano_inicio) & (df["Ano"] <= ano_fim)]
+    # min_ano/max_ano vêm de list_indicators: séries fora do período nem são lidas do cache
+    no_periodo = [i for i in inds_to_show if i["max_ano"] >= ano_inicio and i["min_ano"] <= ano_fim]
+    if not no_periodo:
+        st.info("Nenhum indicador desta categoria possui dados no período selecionado.")
+        return
+
+    # Todas as séries da aba em uma única consulta, já recortadas ao período
+    dfs = cached_get_timeseries_bulk_range(_section_series(inds_to_show), ano_inicio, ano_fim)
+    series = []
+    for item in no_periodo:
+        df = dfs[(item["indicator_key"], item["source"])]
         if df.empty:
             continue
-
-        meta = lazy_get_indicator_info(item["indicator_key"])
-        title = meta.get("nome", item["indicator_key"])
         unit = item.get("unit", "")
+        series.append((
+            item["nome"],
+            f"{item['source']} ({unit})" if unit else item["source"],
+            df,
+            unit,
+        ))
+
+    if not series:
+        return
 
-        st.subheader(title)
-        fig = px.line(
-            df, x="Ano", y="Valor", markers=True,
-            color_discrete_sequence=["#1e3a8a"],
+    # Um único gráfico (um subgráfico por indicador): uma só mensagem ao navegador
+    fig = _stacked_line_figure([(title, source, _downsample(df)) for title, source, df, _ in series])
+    fig = plotly_institutional_theme(fig)
+    st.plotly_chart(fig, use_container_width=True)
+
+    # Detalhes técnicos sempre disponíveis no painel interno
+    for title, source, df, unit in series:
+        # on_change="rerun" torna o conteúdo preguiçoso: tendência e tabela só são
+        # calculadas e serializadas quando o expander está aberto
+        expander = st.expander(
+            f"📊 Dados e Tendência – {title}", expanded=False,
+            key=f"dados_{title}_{source}", on_change="rerun",
         )
-        fig = plotly_institutional_theme(
-            fig,
-            title=title,
-            source=f"{item['source']} ({unit})" if unit else item["source"],
-        )
-        st.plotly_chart(fig, use_container_width=True)
-
-        # Detalhes técnicos sempre disponíveis no painel interno
-        with st.expander("📊 Dados e Tendência", expanded=False):
+        if not expander.open:
+            continue
+        with expander:
             try:
                 st.write(lazy_analisar_tendencia(df))
             except Exception:
                 pass
+            tabela = df
+            if len(df) > LINHAS_TABELA_PADRAO and not st.toggle(
+                f"Carregar todas as {len(df)} linhas", key=f"tabela_completa_{title}_{source}"
+            ):
+                tabela = df.tail(LINHAS_TABELA_PADRAO)
+            # Valor segue numérico (ordenável); a formatação com separadores do
+            # idioma do navegador é feita no cliente, sem fmt_br linha a linha
             st.dataframe(
-                df[["Ano", "Valor", "Unidade"]].rename(columns={"Valor": unit or "Valor"}),
+                tabela[["Ano", "Valor", "Unidade"]].rename(columns={"Valor": unit or "Valor"}),
                 use_container_width=True,
+                column_config={unit or "Valor": st.column_config.NumberColumn(format="localized")},
             )
 
+@st.cache_resource(show_spinner=False)
+def _logo_bytes() -> Optional[bytes]:
+    """Logo da prefeitura lido do disco uma vez por processo (None se ausente)."""
+    return LOGO_PATH.read_bytes() if LOGO_PATH.exists() else None
+
+# Páginas com renderizador próprio, todas chamadas como render(ano_inicio, ano_fim);
+# as demais abas caem em render_outras_paginas.
+_ROUTES = {
+    "Visão Geral": render_visao_geral,
+    "Economia": render_economia,
+    "Trabalho & Renda": render_trabalho_renda,
+    "Sustentabilidade": render_sustentabilidade,
+    "PIB Estimado": render_pib_estimado,
+    "Dashboard Executivo": lambda ano_inicio, ano_fim: lazy_create_executive_dashboard(),
+    "Métricas do Sistema": lambda ano_inicio, ano_fim: lazy_create_metrics_dashboard(),
+    "Relatórios": render_relatorios,
+    "Metodologia": lambda ano_inicio, ano_fim: render_metodologia(),
+}
+
 def main() -> None:
     """Ponto de entrada principal do Painel GV (Uso Interno – Secretarias)."""
-    # ── CSS institucional v2 ──────────────────────────────────────────────────
+    st.set_page_config(
+        page_title=TITULO_SECRETARIA,
+        layout="wide",
+        initial_sidebar_state="expanded"
+    )
+
+    # ── CSS do painel + CSS institucional v2 ──────────────────────────────────
+    css = _panel_css()
+    if css:
+        st.markdown(css, unsafe_allow_html=True)
     apply_custom_css()
 
+    # ── Pré-carga do cache enquanto o usuário interage com a sidebar ──────────
+    _start_prewarm()
+
     # ── Google Analytics (opcional) ───────────────────────────────────────────
     ga_id = os.getenv("GA_TAG_ID")
     if ga_id:
         inject_google_analytics(ga_id)
 
     # ── Sidebar ───────────────────────────────────────────────────────────────
-    logo_path = os.path.join(os.path.dirname(__file__), "..", "assets", "logo_prefeitura.png")
-    if os.path.exists(logo_path):
-        st.sidebar.image(logo_path, use_container_width=True)
+    logo = _logo_bytes()
+    if logo:
+        st.sidebar.image(logo, use_container_width=True)
 
     st.sidebar.title("Painel GV")
     st.sidebar.caption("Uso interno – Secretarias Municipais")
 
-    # Painel exclusivamente interno: todas as abas sempre disponíveis
-    ABAS = [
-        "Visão Geral",
-        "Economia",
-        "Trabalho & Renda",
-        "Negócios",
-        "Educação",
-        "Saúde",
-        "Sustentabilidade",
-        "PIB Estimado",
-        "Dashboard Executivo",
-        "Métricas do Sistema",
-        "Relatórios",
-        "Metodologia",
-    ]
-
     pagina = st.sidebar.radio("Navegação", ABAS)
     st.sidebar.divider()
     ano_inicio = st.sidebar.number_input("Ano Inicial", min_value=2000, max_value=2030, value=2018)
-    ano_fim = st.sidebar.number_input("Ano Final",   min_value=2000, max_value=2030, value=datetime.now().year)
+    ano_fim = st.sidebar.number_input("Ano Final",   min_value=2000, max_value=2030, value=_CURRENT_YEAR)
 
     # ── Roteamento ────────────────────────────────────────────────────────────
-    if pagina == "Visão Geral":
-        render_visao_geral(ano_inicio, ano_fim)
-    elif pagina == "Economia":
-        render_economia(ano_inicio, ano_fim)
-    elif pagina == "Trabalho & Renda":
-        render_trabalho_renda(ano_inicio, ano_fim)
-    elif pagina == "Sustentabilidade":
-        render_sustentabilidade(ano_inicio, ano_fim)
-    elif pagina == "PIB Estimado":
-        render_pib_estimado(ano_inicio, ano_fim)
-    elif pagina == "Dashboard Executivo":
-        lazy_create_executive_dashboard()
-    elif pagina == "Métricas do Sistema":
-        lazy_create_metrics_dashboard()
-    elif pagina == "Relatórios":
-        render_relatorios(ano_inicio, ano_fim)
-    elif pagina == "Metodologia":
-        render_metodologia()
+    render = _ROUTES.get(pagina)
+    if render is not None:
+        render(ano_inicio, ano_fim)
     else:
         render_outras_paginas(pagina, ano_inicio, ano_fim)
 
-
 if __name__ == "__main__":
     main()
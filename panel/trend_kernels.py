@@ -0,0 +1,182 @@
+"""
+Kernels numéricos do painel.
+
+- Tendências em lote: as séries são passadas em formato CSR (valores/anos
+  concatenados + offsets), permitindo processar vários indicadores em um único
+  laço compilado.
+- Redução de pontos (MinMax-LTTB) para séries longas antes de enviá-las ao navegador.
+"""
+import logging
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Importação condicional do Numba: acelerador opcional, fora do requirements.txt.
+# Com `pip install numba` passam a ser usados os kernels compilados
+# (_slopes_csr_numba, _lttb_indices_numba); sem ele, versão vetorizada em NumPy.
+try:
+    from numba import njit
+    HAS_NUMBA = True
+except ImportError:
+    HAS_NUMBA = False
+    logger.info("Numba não instalado. Tendências serão calculadas com NumPy vetorizado.")
+
+
+def _slopes_csr_numpy(values: np.ndarray, years: np.ndarray, offsets: np.ndarray) -> np.ndarray:
+    """Coeficientes angulares por segmento usando reduções segmentadas do NumPy."""
+    n = offsets.size - 1
+    if n <= 0:
+        return np.empty(0)
+    starts = offsets[:-1]
+    counts = np.diff(offsets).astype(np.float64)
+    mx = np.add.reduceat(years, starts) / counts
+    my = np.add.reduceat(values, starts) / counts
+    dx = years - np.repeat(mx, np.diff(offsets))
+    dy = values - np.repeat(my, np.diff(offsets))
+    num = np.add.reduceat(dx * dy, starts)
+    den = np.add.reduceat(dx * dx, starts)
+    out = np.zeros(n)
+    np.divide(num, den, out=out, where=den > 0)
+    return out
+
+
+if HAS_NUMBA:
+    @njit(cache=True, fastmath=True)
+    def _slopes_csr_numba(values, years, offsets):
+        n = offsets.size - 1
+        out = np.empty(n)
+        for k in range(n):
+            s, e = offsets[k], offsets[k + 1]
+            mx = years[s:e].mean()
+            my = values[s:e].mean()
+            num = 0.0
+            den = 0.0
+            for i in range(s, e):
+                dx = years[i] - mx
+                num += dx * (values[i] - my)
+                den += dx * dx
+            out[k] = num / den if den > 0 else 0.0
+        return out
+
+
+def slopes_csr(values: np.ndarray, years: np.ndarray, offsets: np.ndarray) -> np.ndarray:
+    """
+    Calcula o coeficiente angular (regressão linear) de várias séries de uma vez.
+
+    Args:
+        values:  Valores de todas as séries concatenados (float64).
+        years:   Anos correspondentes, concatenados na mesma ordem (float64).
+        offsets: Índices de início de cada série, com o total ao final (int64, tamanho K+1).
+                 Cada segmento deve ter ao menos um ponto.
+
+    Returns:
+        Array com K coeficientes angulares (0.0 quando a variância dos anos é nula).
+    """
+    values = np.ascontiguousarray(values, dtype=np.float64)
+    years = np.ascontiguousarray(years, dtype=np.float64)
+    offsets = np.ascontiguousarray(offsets, dtype=np.int64)
+    if HAS_NUMBA:
+        return _slopes_csr_numba(values, years, offsets)
+    return _slopes_csr_numpy(values, years, offsets)
+
+
+def _lttb_indices_numpy(x: np.ndarray, y: np.ndarray, edges: np.ndarray, n_out: int) -> np.ndarray:
+    """LTTB com um laço Python por balde e a área dos candidatos vetorizada em NumPy."""
+    n = x.size
+    out = np.empty(n_out, dtype=np.int64)
+    out[0] = 0
+    out[-1] = n - 1
+    prev = 0
+    for b in range(n_out - 2):
+        start, end = edges[b], edges[b + 1]
+        # Média do balde seguinte (ou o último ponto, no último balde)
+        nxt_end = edges[b + 2] if b + 2 < edges.size else n
+        nxt_start = end if b + 2 < edges.size else n - 1
+        mx = x[nxt_start:nxt_end].mean()
+        my = y[nxt_start:nxt_end].mean()
+        # Área do triângulo (prev, candidato, média do próximo balde)
+        area = np.abs(
+            (x[prev] - mx) * (y[start:end] - y[prev])
+            - (x[prev] - x[start:end]) * (my - y[prev])
+        )
+        prev = start + int(area.argmax())
+        out[b + 1] = prev
+    return out
+
+
+if HAS_NUMBA:
+    @njit("i8[:](f8[:], f8[:], i8[:], i8)", cache=True)
+    def _lttb_indices_numba(x, y, edges, n_out):
+        n = x.size
+        out = np.empty(n_out, dtype=np.int64)
+        out[0] = 0
+        out[n_out - 1] = n - 1
+        prev = 0
+        for b in range(n_out - 2):
+            start, end = edges[b], edges[b + 1]
+            if b + 2 < edges.size:
+                nxt_start, nxt_end = end, edges[b + 2]
+            else:
+                nxt_start, nxt_end = n - 1, n
+            mx = x[nxt_start:nxt_end].mean()
+            my = y[nxt_start:nxt_end].mean()
+            best = start
+            best_area = -1.0
+            for i in range(start, end):
+                area = abs((x[prev] - mx) * (y[i] - y[prev]) - (x[prev] - x[i]) * (my - y[prev]))
+                if area > best_area:
+                    best_area = area
+                    best = i
+            prev = best
+            out[b + 1] = prev
+        return out
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, n_out: int) -> np.ndarray:
+    """
+    Largest-Triangle-Three-Buckets: índices de `n_out` pontos que preservam a forma
+    visual da série. O primeiro e o último ponto são sempre mantidos.
+    """
+    x = np.ascontiguousarray(x, dtype=np.float64)
+    y = np.ascontiguousarray(y, dtype=np.float64)
+    n = x.size
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    # Fronteiras dos n_out - 2 baldes internos (primeiro/último ponto ficam fora)
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    if HAS_NUMBA:
+        return _lttb_indices_numba(x, y, edges, n_out)
+    return _lttb_indices_numpy(x, y, edges, n_out)
+
+
+def minmax_lttb_indices(x: np.ndarray, y: np.ndarray, n_out: int, ratio: int = 4) -> np.ndarray:
+    """
+    MinMax-LTTB: pré-seleciona mínimos/máximos por balde (vetorizado) e aplica o
+    LTTB apenas sobre esses `n_out * ratio` candidatos. Mesmo resultado visual do
+    LTTB com custo próximo de O(n) em NumPy.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    n = x.size
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    n_bins = max((n_out * ratio) // 2, 1)
+    interior = n - 2
+    if interior <= n_bins * 2:
+        return lttb_indices(x, y, n_out)
+
+    # Baldes de tamanho fixo sobre os pontos internos; a sobra forma um balde final
+    size = interior // n_bins
+    full = n_bins * size
+    block = y[1:1 + full].reshape(n_bins, size)
+    base = 1 + np.arange(n_bins) * size
+    cand = [base + block.argmin(axis=1), base + block.argmax(axis=1)]
+    if full < interior:
+        tail = y[1 + full:n - 1]
+        cand.append(np.array([1 + full + tail.argmin(), 1 + full + tail.argmax()]))
+    idx = np.unique(np.concatenate([[0, n - 1], *cand]))
+
+    return idx[lttb_indices(x[idx], y[idx], n_out)]
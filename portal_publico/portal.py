@@ -4,13 +4,29 @@ Mesmo título da Secretaria; indicadores principais em gráficos simples.
 Sem geração de relatório completo.
 """
 import streamlit as st
-import plotly.express as px
+import plotly.graph_objects as go
 
 from config import MUNICIPIO, UF
-from database import get_timeseries, init_db, list_indicators
+from database import get_timeseries_pairs, init_db, list_indicators
 
 TITULO_SECRETARIA = "Secretaria Municipal de Desenvolvimento, Ciência, Tecnologia e Inovação"
 
+# Todas as séries do portal, buscadas juntas em uma única consulta
+SERIES_PORTAL = (
+    ("PIB_TOTAL", "IBGE"),
+    ("EMPREGOS_CAGED", "CAGED_NOVO"),
+    ("EMPREGOS_CAGED", "CAGED"),
+    ("IDSC_GERAL", "IDSC"),
+    ("EMISSOES_GEE", "SEEG"),
+)
+
+
+@st.cache_data(ttl=3600)
+def carregar_series() -> dict:
+    """Séries do portal (indicador, fonte) -> DataFrame, com cache de 1h."""
+    return get_timeseries_pairs(list(SERIES_PORTAL))
+
+
 init_db()
 
 st.set_page_config(
@@ -22,27 +38,31 @@ st.title(TITULO_SECRETARIA)
 st.caption(f"**Observatório Socioeconômico Público** – {MUNICIPIO}/{UF}")
 st.markdown("---")
 
+series = carregar_series()
+
 # Indicadores principais: PIB, CAGED, RAIS
 col1, col2 = st.columns(2)
 
 with col1:
     st.subheader("📊 PIB Municipal (R$ mil)")
-    pib = get_timeseries("PIB_TOTAL", source="IBGE")
+    pib = series[("PIB_TOTAL", "IBGE")]
     if pib.empty:
         st.info("Dados de PIB em atualização.")
     else:
-        fig = px.line(pib, x="Ano", y="Valor", markers=True)
+        fig = go.Figure(go.Scattergl(x=pib["Ano"].to_numpy(), y=pib["Valor"].to_numpy(), mode="lines+markers"))
+        fig.update_layout(xaxis_title="Ano", yaxis_title="Valor")
         st.plotly_chart(fig, use_container_width=True)
 
 with col2:
     st.subheader("👷 Empregos Formais – CAGED")
-    caged = get_timeseries("EMPREGOS_CAGED", source="CAGED_NOVO")
+    caged = series[("EMPREGOS_CAGED", "CAGED_NOVO")]
     if caged.empty:
-        caged = get_timeseries("EMPREGOS_CAGED", source="CAGED")
+        caged = series[("EMPREGOS_CAGED", "CAGED")]
     if caged.empty:
         st.info("Dados de CAGED em atualização.")
     else:
-        fig = px.bar(caged, x="Ano", y="Valor")
+        fig = go.Figure(go.Bar(x=caged["Ano"].to_numpy(), y=caged["Valor"].to_numpy()))
+        fig.update_layout(xaxis_title="Ano", yaxis_title="Valor")
         st.plotly_chart(fig, use_container_width=True)
 
 st.markdown("---")
@@ -51,14 +71,14 @@ st.subheader("🌱 Sustentabilidade")
 col3, col4 = st.columns(2)
 
 with col3:
-    idsc = get_timeseries("IDSC_GERAL", source="IDSC")
+    idsc = series[("IDSC_GERAL", "IDSC")]
     if not idsc.empty:
         st.metric("Índice IDSC", f"{idsc.iloc[-1]['Valor']:.2f}", f"{idsc.iloc[-1]['Ano']}")
     else:
         st.info("IDSC não disponível.")
         
 with col4:
-    emissoes = get_timeseries("EMISSOES_GEE", source="SEEG")
+    emissoes = series[("EMISSOES_GEE", "SEEG")]
     if not emissoes.empty:
         st.metric("Emissões CO₂ (tCO2e)", f"{emissoes.iloc[-1]['Valor']:,.0f}", f"{emissoes.iloc[-1]['Ano']}")
     else:
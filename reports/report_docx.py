@@ -21,14 +21,36 @@ logger = logging.getLogger(__name__)
 
 TITULO_SECRETARIA = "Secretaria Municipal de Desenvolvimento, Ciência, Tecnologia e Inovação"
 
-def _fmt_num(val: float) -> str:
-    """Formata número para exibição em português (vírgula decimal)."""
-    try:
-        if val >= 1_000_000:
-            return f"{val/1_000_000:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".") + " mi"
-        return f"{val:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".")
-    except:
-        return str(val)
+# Troca "," <-> "." em uma única passada (padrão en-US -> pt-BR)
+_BR_SEPARATORS = str.maketrans({",": ".", ".": ","})
+
+def _fmt_num_series(valores: pd.Series) -> pd.Series:
+    """Formata uma coluna numérica em português (vírgula decimal; "mi" a partir de 1 milhão).
+
+    Escala, máscara de milhões e troca de separadores operam na coluna inteira; só a
+    formatação com milhar passa elemento a elemento, em um único map.
+    """
+    mi = valores >= 1_000_000
+    texto = valores.where(~mi, valores / 1_000_000).map("{:,.2f}".format).str.translate(_BR_SEPARATORS)
+    return texto.where(~mi, texto + " mi")
+
+def _add_rows_ano_valor(table, df: pd.DataFrame, *extra: str) -> None:
+    """Acrescenta à tabela uma linha por ano (ordem crescente): Ano, Valor formatado e
+    colunas fixas opcionais.
+
+    Linhas sem ano válido são ignoradas; valores não numéricos saem como texto, sem
+    interromper o relatório.
+    """
+    anos = pd.to_numeric(df["Ano"], errors="coerce")
+    serie = df.assign(Ano=anos).dropna(subset=["Ano"]).sort_values("Ano")
+    numeros = pd.to_numeric(serie["Valor"], errors="coerce")
+    valores = _fmt_num_series(numeros).where(numeros.notna(), serie["Valor"].map(str))
+    for ano, valor in zip(serie["Ano"].astype(int).astype(str), valores):
+        row_cells = table.add_row().cells
+        row_cells[0].text = ano
+        row_cells[1].text = valor
+        for i, texto in enumerate(extra, start=2):
+            row_cells[i].text = texto
 
 def gerar_relatorio_docx(
     ano_inicio: int,
@@ -77,13 +99,7 @@ def gerar_relatorio_docx(
         hdr_cells[1].text = 'Valor Estimado (R$ mil)'
         hdr_cells[2].text = 'Status'
         
-        for _, row in df_prev.sort_values("Ano").iterrows():
-            try:
-                row_cells = table.add_row().cells
-                row_cells[0].text = str(int(row["Ano"]))
-                row_cells[1].text = _fmt_num(row["Valor"])
-                row_cells[2].text = "Projeção"
-            except: continue
+        _add_rows_ano_valor(table, df_prev, "Projeção")
 
     # 3. Indicadores Socioeconômicos (Executivo)
     doc.add_heading("3. Análise Detalhada por Indicador", level=1)
@@ -170,12 +186,7 @@ def gerar_relatorio_docx(
         hdr_cells[0].text = 'Ano'
         hdr_cells[1].text = f"Valor ({unidade})" if unidade else "Valor"
         
-        for _, row in df.sort_values("Ano").iterrows():
-            try:
-                row_cells = table.add_row().cells
-                row_cells[0].text = str(int(row["Ano"]))
-                row_cells[1].text = _fmt_num(row["Valor"])
-            except: continue
+        _add_rows_ano_valor(table, df)
             
         doc.add_paragraph("\n") # Espaçador
 
@@ -0,0 +1,121 @@
+"""Leitura incremental do etl.log em HealthChecker (contador de erros em janela)."""
+import os
+import threading
+import time
+
+import pytest
+
+import monitoring.health_checker as hc
+
+
+def _append(path, data: bytes) -> None:
+    with open(path, "ab") as f:
+        f.write(data)
+
+
+def _read(checker, path):
+    """Uma leitura incremental, como feita por check_etl_health."""
+    with checker._etl_log_lock:
+        st = os.stat(path)
+        checker._read_etl_log_forward(path, st)
+        checker._etl_log_stat = (st.st_ino, st.st_size, st.st_mtime_ns)
+    return len(checker._etl_error_window), checker._etl_error_count
+
+
+@pytest.fixture
+def log_path(tmp_path):
+    path = tmp_path / "etl.log"
+    path.write_bytes(b"")
+    return path
+
+
+def test_linha_parcial_so_conta_quando_completa(log_path):
+    checker = hc.HealthChecker()
+    _append(log_path, b"INFO ok\nERR")
+    assert _read(checker, log_path) == (1, 0)
+    _append(log_path, b"OR falha")
+    assert _read(checker, log_path) == (1, 0)
+    _append(log_path, b" no passo\nINFO x\n")
+    assert _read(checker, log_path) == (3, 1)
+
+
+def test_truncamento_reinicia_contadores(log_path):
+    checker = hc.HealthChecker()
+    _append(log_path, b"ERROR a\nERROR b\nINFO c\n")
+    assert _read(checker, log_path) == (3, 2)
+    log_path.write_bytes(b"INFO novo\n")
+    assert _read(checker, log_path) == (1, 0)
+
+
+def test_rotacao_reinicia_contadores(log_path, tmp_path):
+    checker = hc.HealthChecker()
+    _append(log_path, b"ERROR a\n")
+    assert _read(checker, log_path) == (1, 1)
+    # Novo arquivo (outro inode) no lugar do antigo, maior que o offset atual
+    rotated = tmp_path / "etl.log.new"
+    rotated.write_bytes(b"INFO 1\nINFO 2\nINFO 3\n")
+    os.replace(rotated, log_path)
+    assert _read(checker, log_path) == (3, 0)
+
+
+def test_janela_inicial_descarta_linha_cortada(log_path, monkeypatch):
+    monkeypatch.setattr(hc, "ETL_LOG_INITIAL_TAIL_BYTES", 12)
+    checker = hc.HealthChecker()
+    # Os últimos 12 bytes começam no meio de "ERROR antiga"
+    _append(log_path, b"INFO inicio\nERROR antiga\nINFO b\n")
+    assert _read(checker, log_path) == (1, 0)
+
+
+def test_janela_inicial_sem_quebra_de_linha(log_path, monkeypatch):
+    monkeypatch.setattr(hc, "ETL_LOG_INITIAL_TAIL_BYTES", 5)
+    checker = hc.HealthChecker()
+    _append(log_path, b"INFO aaaaaaa\nINFO bbbbbbbbbb")
+    assert _read(checker, log_path) == (0, 0)
+    # O restante da linha cortada continua descartado; só a linha seguinte conta
+    _append(log_path, b"ERROR fim\nERROR c\n")
+    assert _read(checker, log_path) == (1, 1)
+
+
+class _ArquivoLento:
+    """Arquivo cuja leitura demora: alarga a janela entre o seek e o avanço do offset."""
+
+    def __init__(self, f):
+        self._f = f
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self._f.close()
+
+    def seek(self, pos):
+        return self._f.seek(pos)
+
+    def read(self, n):
+        time.sleep(0.02)
+        return self._f.read(n)
+
+
+def test_leituras_concorrentes_nao_duplicam_linhas(tmp_path, monkeypatch):
+    monkeypatch.setattr(hc, "DATA_DIR", tmp_path)
+    etl_log = tmp_path / "logs" / "etl.log"
+    etl_log.parent.mkdir()
+    etl_log.write_bytes(b"INFO inicio\n")
+    checker = hc.HealthChecker()
+    checker.check_etl_health()
+
+    _append(etl_log, b"".join(b"ERROR x\n" if i % 4 == 0 else b"INFO y\n" for i in range(40)))
+    monkeypatch.setattr(hc, "open", lambda *a, **k: _ArquivoLento(open(*a, **k)), raising=False)
+
+    def run():
+        checker.status_cache.clear()
+        checker.check_etl_health()
+
+    threads = [threading.Thread(target=run) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len(checker._etl_error_window) == 41
+    assert checker._etl_error_count == 10
+    assert checker._etl_log_offset == etl_log.stat().st_size
@@ -0,0 +1,107 @@
+"""Kernels numéricos do painel: tendências em CSR e redução de pontos (LTTB)."""
+import numpy as np
+import pytest
+
+import panel.trend_kernels as tk
+
+requires_numba = pytest.mark.skipif(not tk.HAS_NUMBA, reason="Numba não instalado")
+
+
+@pytest.fixture(params=[False, True], ids=["numpy", "numba"])
+def use_numba(request, monkeypatch):
+    """Executa o teste pelos caminhos NumPy e Numba da API pública."""
+    if request.param and not tk.HAS_NUMBA:
+        pytest.skip("Numba não instalado")
+    monkeypatch.setattr(tk, "HAS_NUMBA", request.param)
+    return request.param
+
+
+def _serie(n, seed=0):
+    rng = np.random.default_rng(seed)
+    x = np.arange(n, dtype=np.float64)
+    y = np.cumsum(rng.normal(size=n))
+    return x, y
+
+
+def _csr(series):
+    values = np.concatenate([np.asarray(v, dtype=np.float64) for _, v in series])
+    years = np.concatenate([np.asarray(a, dtype=np.float64) for a, _ in series])
+    offsets = np.cumsum([0] + [len(v) for _, v in series])
+    return values, years, offsets
+
+
+# --- Tendências (slopes_csr) ------------------------------------------------
+
+def test_slopes_igual_ao_polyfit(use_numba):
+    series = [([2018, 2019, 2020, 2021], [1.0, 3.0, 2.0, 6.0]), ([2000, 2010], [5.0, 1.0])]
+    out = tk.slopes_csr(*_csr(series))
+    esperado = [np.polyfit(a, v, 1)[0] for a, v in series]
+    np.testing.assert_allclose(out, esperado)
+
+
+def test_slopes_serie_constante_tem_inclinacao_zero(use_numba):
+    out = tk.slopes_csr(*_csr([([2019, 2020, 2021], [7.0, 7.0, 7.0])]))
+    np.testing.assert_array_equal(out, [0.0])
+
+
+def test_slopes_segmento_com_menos_de_dois_pontos(use_numba):
+    series = [([2020], [10.0]), ([2019, 2020], [1.0, 2.0]), ([2021], [3.0])]
+    out = tk.slopes_csr(*_csr(series))
+    np.testing.assert_allclose(out, [0.0, 1.0, 0.0])
+
+
+def test_slopes_sem_segmentos(use_numba):
+    out = tk.slopes_csr(np.empty(0), np.empty(0), np.array([0]))
+    assert out.size == 0
+
+
+@requires_numba
+def test_slopes_numpy_e_numba_coincidem():
+    rng = np.random.default_rng(1)
+    counts = rng.integers(1, 30, size=50)
+    offsets = np.concatenate([[0], np.cumsum(counts)]).astype(np.int64)
+    years = np.concatenate([np.arange(c, dtype=np.float64) + 2000 for c in counts])
+    values = rng.normal(size=years.size)
+    np.testing.assert_allclose(
+        tk._slopes_csr_numba(values, years, offsets),
+        tk._slopes_csr_numpy(values, years, offsets),
+        rtol=1e-9, atol=1e-12,
+    )
+
+
+# --- Redução de pontos (LTTB / MinMax-LTTB) ---------------------------------
+
+@pytest.mark.parametrize("n_out", [3, 10, 57])
+def test_lttb_mantem_primeiro_e_ultimo(use_numba, n_out):
+    x, y = _serie(500)
+    idx = tk.lttb_indices(x, y, n_out)
+    assert idx.size == n_out
+    assert idx[0] == 0 and idx[-1] == x.size - 1
+    assert np.all(np.diff(idx) > 0)
+
+
+@pytest.mark.parametrize("n_out", [10, 100])
+def test_lttb_serie_curta_volta_inalterada(use_numba, n_out):
+    x, y = _serie(10)
+    np.testing.assert_array_equal(tk.lttb_indices(x, y, n_out), np.arange(10))
+    np.testing.assert_array_equal(tk.minmax_lttb_indices(x, y, n_out), np.arange(10))
+
+
+@pytest.mark.parametrize("n", [1000, 1003])
+def test_minmax_lttb_mantem_primeiro_e_ultimo(use_numba, n):
+    x, y = _serie(n, seed=2)
+    idx = tk.minmax_lttb_indices(x, y, 50)
+    assert idx.size == 50
+    assert idx[0] == 0 and idx[-1] == n - 1
+    assert np.all(np.diff(idx) > 0)
+
+
+@requires_numba
+@pytest.mark.parametrize("n, n_out", [(100, 3), (1000, 40), (1001, 333)])
+def test_lttb_numpy_e_numba_coincidem(n, n_out):
+    x, y = _serie(n, seed=n)
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    np.testing.assert_array_equal(
+        tk._lttb_indices_numba(x, y, edges, n_out),
+        tk._lttb_indices_numpy(x, y, edges, n_out),
+    )
@@ -6,6 +6,8 @@ Implementa monitoramento de saúde do sistema e envio de notificações.
 import logging
 import smtplib
 import time
+from collections import deque
+from itertools import islice
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 from datetime import datetime, timedelta
@@ -29,7 +31,11 @@ class AlertManager:
             'system_error_rate': 0.02  # 2% de erro geral
         }
         
-        self.alert_history = []
+        # Histórico limitado aos últimos 100 alertas (descartes em O(1))
+        self.alert_history = deque(maxlen=100)
+        # Índice dos alertas de alta prioridade: subsequência do histórico, na mesma
+        # ordem, mantida na inserção e esvaziada junto com ele
+        self.high_priority_alerts = deque()
         self.alert_cooldown = timedelta(minutes=30)  # Evitar spam de alertas
         self.last_alerts = {}
         
@@ -108,12 +114,19 @@ class AlertManager:
             'metadata': metadata or {}
         }
         
+        # O alerta descartado pelo histórico cheio sai também do índice de prioridade
+        if len(self.alert_history) == self.alert_history.maxlen:
+            evicted = self.alert_history[0]
+            if self.high_priority_alerts and self.high_priority_alerts[0] is evicted:
+                self.high_priority_alerts.popleft()
         self.alert_history.append(alert_data)
+        if priority == 'high':
+            self.high_priority_alerts.append(alert_data)
         self.alert_logger.warning(f"[{alert_type.upper()}] {message}")
-        
-        # Manter histórico de alertas (últimos 100)
-        if len(self.alert_history) > 100:
-            self.alert_history = self.alert_history[-100:]
+    
+    def get_recent_alerts(self, n: int) -> List[Dict[str, Any]]:
+        """Retorna os n alertas mais recentes (equivalente a alert_history[-n:])."""
+        return list(islice(self.alert_history, max(0, len(self.alert_history) - n), None))
     
     def _check_cooldown(self, alert_key: str) -> bool:
         """Verifica se ainda está em cooldown para evitar spam."""
@@ -341,7 +354,7 @@ class AlertManager:
     
     def create_alert_report(self) -> Dict[str, Any]:
         """Cria relatório completo de alertas."""
-        recent_alerts = self.alert_history[-20:]
+        recent_alerts = self.get_recent_alerts(20)
         
         report = {
             'timestamp': datetime.now().isoformat(),
@@ -369,7 +382,7 @@ class AlertManager:
         if not self.alert_history:
             return "Nenhuma alerta registrada recentemente."
         
-        recent_alerts = self.alert_history[-5:]
+        recent_alerts = self.get_recent_alerts(5)
         summary_lines = ["Resumo das últimas alertas:"]
         
         for alert in recent_alerts:
@@ -1,6 +1,4 @@
 import streamlit as st
-import plotly.graph_objects as go
-import plotly.express as px
 
 def metric_card(label: str, value: str, sublabel: str = "", border_color: str = "#2563eb"):
     """
@@ -28,57 +26,66 @@ def metric_card(label: str, value: str, sublabel: str = "", border_color: str =
     </div>
     """, unsafe_allow_html=True)
 
+# Paleta de cores institucional (Blue 900 base)
+MAIN_COLOR = "#1e3a8a"  # blue-900
+SECONDARY_COLOR = "#64748b" # slate-500
+GRID_COLOR = "#e2e8f0" # slate-200
+
+# Layout institucional montado uma única vez; por figura só o título é gerado
+_INSTITUTIONAL_TITLE = {
+    'y': 0.95,
+    'x': 0,
+    'xanchor': 'left',
+    'yanchor': 'top'
+}
+_INSTITUTIONAL_LAYOUT = dict(
+    font={'family': "Outfit, sans-serif", 'color': "#1e293b"},
+    plot_bgcolor="white",
+    paper_bgcolor="white",
+    uirevision="painel_gv",  # reruns reaproveitam o canvas (zoom/legenda preservados)
+    margin=dict(l=40, r=40, t=80, b=40),
+    xaxis=dict(
+        showgrid=False,
+        zeroline=False,
+        linecolor=SECONDARY_COLOR,
+        tickfont=dict(size=12, color=SECONDARY_COLOR),
+        title=None
+    ),
+    yaxis=dict(
+        showgrid=True,
+        gridcolor=GRID_COLOR,
+        zeroline=False,
+        linecolor="white",
+        tickfont=dict(size=12, color=SECONDARY_COLOR),
+        title=None,
+        tickprefix="   " # padding
+    ),
+    legend=dict(
+        orientation="h",
+        yanchor="bottom",
+        y=1.02,
+        xanchor="right",
+        x=1,
+        title=None,
+        font=dict(size=11, color=SECONDARY_COLOR)
+    ),
+    hoverlabel=dict(
+        bgcolor="white",
+        font_size=13,
+        font_family="Outfit, sans-serif"
+    )
+)
+
 def apply_institutional_layout(fig, title: str = "", source: str = ""):
     """
     Aplica o layout padrão institucional (Azul Marinho/Cinza) a gráficos Plotly.
     """
-    # Paleta de cores institucional (Blue 900 base)
-    MAIN_COLOR = "#1e3a8a"  # blue-900
-    SECONDARY_COLOR = "#64748b" # slate-500
-    GRID_COLOR = "#e2e8f0" # slate-200
-    
     fig.update_layout(
-        title={
-            'text': f"<b>{title}</b><br><span style='font-size: 12px; color: gray;'>Fonte: {source}</span>",
-            'y': 0.95,
-            'x': 0,
-            'xanchor': 'left',
-            'yanchor': 'top'
-        },
-        font={'family': "Outfit, sans-serif", 'color': "#1e293b"},
-        plot_bgcolor="white",
-        paper_bgcolor="white",
-        margin=dict(l=40, r=40, t=80, b=40),
-        xaxis=dict(
-            showgrid=False,
-            zeroline=False,
-            linecolor=SECONDARY_COLOR,
-            tickfont=dict(size=12, color=SECONDARY_COLOR),
-            title=None
-        ),
-        yaxis=dict(
-            showgrid=True,
-            gridcolor=GRID_COLOR,
-            zeroline=False,
-            linecolor="white",
-            tickfont=dict(size=12, color=SECONDARY_COLOR),
-            title=None,
-            tickprefix="   " # padding
-        ),
-        legend=dict(
-            orientation="h",
-            yanchor="bottom",
-            y=1.02,
-            xanchor="right",
-            x=1,
-            title=None,
-            font=dict(size=11, color=SECONDARY_COLOR)
+        _INSTITUTIONAL_LAYOUT,
+        title=dict(
+            _INSTITUTIONAL_TITLE,
+            text=f"<b>{title}</b><br><span style='font-size: 12px; color: gray;'>Fonte: {source}</span>",
         ),
-        hoverlabel=dict(
-            bgcolor="white",
-            font_size=13,
-            font_family="Outfit, sans-serif"
-        )
     )
     
     # Atualizar traces para usar a cor institucional se não definida
@@ -6,8 +6,12 @@ Funções principais:
     apply_custom_css()           – Injeta CSS premium no app Streamlit.
     plotly_institutional_theme() – Aplica tema de cores ao Figure Plotly.
     render_kpi_grid()            – Grade moderna de KPIs com st.metric.
+    render_kpi_html()            – Mesma grade em um único bloco HTML.
 """
 
+from functools import lru_cache
+from html import escape
+
 import streamlit as st
 
 
@@ -27,18 +31,25 @@ COLORS = {
     "warning":   "#d97706",
 }
 
+# Fontes do sistema (sem requisição ao Google Fonts); Outfit é usada se estiver instalada
+FONT_STACK = "Outfit, system-ui, -apple-system, Segoe UI, Roboto, sans-serif"
+FONT_STACK_CSS = "'Outfit', system-ui, -apple-system, \"Segoe UI\", Roboto, sans-serif"
 
-def apply_custom_css() -> None:
-    """Aplica CSS customizado para tornar o Streamlit visualmente institucional."""
-    st.markdown(
-        f"""
-        <link rel="preconnect" href="https://fonts.googleapis.com">
-        <link rel="preconnect" href="https://fonts.gstatic.com" crossorigin>
-        <link href="https://fonts.googleapis.com/css2?family=Outfit:wght@400;600;700;800&display=swap" rel="stylesheet">
+
+def _compact_css(css: str) -> str:
+    """Remove indentação e linhas vazias do bloco CSS (menos bytes por rerun)."""
+    return "\n".join(line.strip() for line in css.splitlines() if line.strip())
+
+
+# Bloco montado uma única vez na importação; cada rerun apenas reenvia a string pronta.
+# (O st.markdown precisa ser chamado em todo rerun: elementos não reemitidos
+# são removidos da página pelo Streamlit, levando o estilo junto.)
+_CUSTOM_CSS = _compact_css(
+    f"""
         <style>
         /* ── Base ─────────────────────────────────────────── */
         html, body, [class*="st-"] {{
-            font-family: 'Outfit', sans-serif !important;
+            font-family: {FONT_STACK_CSS} !important;
         }}
         .stApp {{
             background-color: #f1f5f9;
@@ -77,16 +88,57 @@ def apply_custom_css() -> None:
             font-weight: 600 !important;
         }}
 
+        /* ── Grade de KPIs em HTML (render_kpi_html) ─────── */
+        .kpi-grid {{
+            display: grid;
+            grid-template-columns: repeat(var(--kpi-cols, 4), minmax(0, 1fr));
+            gap: 1rem;
+            margin-bottom: 1rem;
+        }}
+        .kpi-card {{
+            background-color: {COLORS["white"]};
+            border: 1px solid {COLORS["border"]};
+            padding: 20px 18px;
+            border-radius: 14px;
+            box-shadow: 0 2px 8px rgba(0, 0, 0, 0.07);
+            transition: transform 0.2s, box-shadow 0.2s;
+        }}
+        .kpi-card:hover {{
+            transform: translateY(-3px);
+            box-shadow: 0 8px 20px rgba(30, 58, 138, 0.1);
+        }}
+        .kpi-card .kpi-label {{
+            color: {COLORS["text_muted"]};
+            font-size: 0.88rem;
+            font-weight: 600;
+            text-transform: uppercase;
+            letter-spacing: 0.06em;
+        }}
+        .kpi-card .kpi-value {{
+            font-size: 2.1rem;
+            font-weight: 700;
+            color: {COLORS["text_dark"]};
+            letter-spacing: -0.02em;
+        }}
+        .kpi-card .kpi-delta {{
+            font-size: 0.85rem;
+            font-weight: 600;
+            color: {COLORS["success"]};
+        }}
+        .kpi-card .kpi-delta.negative {{
+            color: {COLORS["danger"]};
+        }}
+
         /* ── Títulos ──────────────────────────────────────── */
         h1 {{
             color: {COLORS["primary"]} !important;
             font-weight: 800 !important;
-            font-family: 'Outfit', sans-serif !important;
+            font-family: {FONT_STACK_CSS} !important;
         }}
         h2, h3 {{
             color: {COLORS["text_dark"]} !important;
             font-weight: 700 !important;
-            font-family: 'Outfit', sans-serif !important;
+            font-family: {FONT_STACK_CSS} !important;
         }}
 
         /* ── Gráficos ─────────────────────────────────────── */
@@ -166,9 +218,103 @@ def apply_custom_css() -> None:
             font-style: italic;
         }}
         </style>
-        """,
-        unsafe_allow_html=True,
+    """
+)
+
+
+def apply_custom_css() -> None:
+    """Aplica CSS customizado para tornar o Streamlit visualmente institucional."""
+    st.markdown(_CUSTOM_CSS, unsafe_allow_html=True)
+
+
+# ---------------------------------------------------------------------------
+# Tema Plotly: dicionários montados uma única vez na importação
+# ---------------------------------------------------------------------------
+_THEME_TITLE = {
+    "x": 0,
+    "xanchor": "left",
+    "y": 0.97,
+    "yanchor": "top",
+    "font": {"size": 15, "color": COLORS["primary"], "family": FONT_STACK},
+}
+_THEME_LAYOUT = {
+    "plot_bgcolor": "rgba(0,0,0,0)",
+    "paper_bgcolor": "rgba(0,0,0,0)",
+    # Separadores pt-BR (decimal ",", milhar ".") formatados no próprio navegador
+    "separators": ",.",
+    "font": {
+        "family": FONT_STACK,
+        "color": COLORS["primary"],
+        "size": 12,
+    },
+    "margin": dict(l=20, r=20, t=55, b=20),
+    "legend": dict(
+        orientation="h",
+        yanchor="bottom",
+        y=1.02,
+        xanchor="right",
+        x=1,
+        bgcolor="rgba(0,0,0,0)",
+        font=dict(size=11, color=COLORS["text_muted"]),
+    ),
+    "hovermode": "x unified",
+    # Revisão fixa: nos reruns o Plotly atualiza o gráfico no mesmo canvas,
+    # preservando zoom/legenda em vez de remontar a figura
+    "uirevision": "painel_gv",
+    "hoverlabel": dict(
+        bgcolor=COLORS["white"],
+        font_size=12,
+        font_family=FONT_STACK,
+        bordercolor=COLORS["border"],
+    ),
+}
+_THEME_XAXIS = dict(
+    showgrid=False,
+    zeroline=False,
+    linecolor=COLORS["border"],
+    tickfont=dict(size=11, color=COLORS["text_muted"]),
+    title_text=None,
+)
+_THEME_YAXIS = dict(
+    showgrid=True,
+    gridcolor="#f1f5f9",
+    zeroline=False,
+    linecolor=COLORS["white"],
+    tickfont=dict(size=11, color=COLORS["text_muted"]),
+    title_text=None,
+)
+_THEME_LINE = dict(color=COLORS["primary"], width=2)
+_THEME_TRACES = (
+    (dict(marker_color=COLORS["primary"]), dict(type="bar")),
+) + tuple(
+    style_selector
+    for trace_type in ("scatter", "scattergl")
+    for style_selector in (
+        (dict(line=_THEME_LINE, marker=dict(color=COLORS["primary"], size=6)),
+         dict(type=trace_type, mode="lines+markers")),
+        (dict(line=_THEME_LINE), dict(type=trace_type, mode="lines")),
     )
+)
+
+THEME_TEMPLATE = "painel_gv"
+
+
+@lru_cache(maxsize=1)
+def _theme_template() -> str:
+    """
+    Registra (uma vez por processo) o template Plotly institucional e devolve seu nome.
+
+    O template parte do padrão vigente do Plotly e incorpora layout e eixos do tema;
+    aplicá-lo é uma única atribuição, em vez de mesclar os dicionários em cada figura.
+    Os eixos do template valem também para os subgráficos (xaxis2, yaxis2, ...).
+    """
+    import plotly.graph_objects as go
+    import plotly.io as pio
+
+    template = go.layout.Template(pio.templates[pio.templates.default])
+    template.layout.update(_THEME_LAYOUT, xaxis=_THEME_XAXIS, yaxis=_THEME_YAXIS)
+    pio.templates[THEME_TEMPLATE] = template
+    return THEME_TEMPLATE
 
 
 def plotly_institutional_theme(fig, title: str = "", source: str = ""):
@@ -192,70 +338,13 @@ def plotly_institutional_theme(fig, title: str = "", source: str = ""):
         )
 
     fig.update_layout(
-        title={
-            "text": title_text,
-            "x": 0,
-            "xanchor": "left",
-            "y": 0.97,
-            "yanchor": "top",
-            "font": {"size": 15, "color": COLORS["primary"], "family": "Outfit, sans-serif"},
-        },
-        plot_bgcolor="rgba(0,0,0,0)",
-        paper_bgcolor="rgba(0,0,0,0)",
-        font={
-            "family": "Outfit, sans-serif",
-            "color": COLORS["primary"],
-            "size": 12,
-        },
-        margin=dict(l=20, r=20, t=55, b=20),
-        legend=dict(
-            orientation="h",
-            yanchor="bottom",
-            y=1.02,
-            xanchor="right",
-            x=1,
-            bgcolor="rgba(0,0,0,0)",
-            font=dict(size=11, color=COLORS["text_muted"]),
-        ),
-        hovermode="x unified",
-        hoverlabel=dict(
-            bgcolor=COLORS["white"],
-            font_size=12,
-            font_family="Outfit, sans-serif",
-            bordercolor=COLORS["border"],
-        ),
-    )
-
-    fig.update_xaxes(
-        showgrid=False,
-        zeroline=False,
-        linecolor=COLORS["border"],
-        tickfont=dict(size=11, color=COLORS["text_muted"]),
-        title_text=None,
-    )
-    fig.update_yaxes(
-        showgrid=True,
-        gridcolor="#f1f5f9",
-        zeroline=False,
-        linecolor=COLORS["white"],
-        tickfont=dict(size=11, color=COLORS["text_muted"]),
-        title_text=None,
+        template=_theme_template(),
+        title=dict(_THEME_TITLE, text=title_text),
     )
 
     # Aplica cor primária em barras e linhas sem cor definida
-    fig.update_traces(
-        marker_color=COLORS["primary"],
-        selector=dict(type="bar"),
-    )
-    fig.update_traces(
-        line=dict(color=COLORS["primary"], width=2),
-        marker=dict(color=COLORS["primary"], size=6),
-        selector=dict(type="scatter", mode="lines+markers"),
-    )
-    fig.update_traces(
-        line=dict(color=COLORS["primary"], width=2),
-        selector=dict(type="scatter", mode="lines"),
-    )
+    for style, selector in _THEME_TRACES:
+        fig.update_traces(style, selector=selector)
 
     return fig
 
@@ -290,3 +379,38 @@ def render_kpi_grid(col_data: list) -> None:
                 delta=data.get("delta"),
                 help=data.get("help"),
             )
+
+
+def render_kpi_html(col_data: list, columns: int = 4) -> None:
+    """
+    Renderiza vários KPIs em um único st.markdown (uma mensagem para o navegador),
+    com o mesmo visual dos cards de st.metric. Indicado para grades estáticas maiores.
+
+    Args:
+        col_data: Lista de dicts no formato de render_kpi_grid ('label', 'value',
+                  'delta', 'help'); 'help' vira tooltip do card.
+        columns:  Número de cards por linha.
+    """
+    if not col_data:
+        return
+
+    cards = []
+    for data in col_data:
+        help_text = data.get("help")
+        title = f' title="{escape(help_text)}"' if help_text else ""
+        delta = data.get("delta")
+        delta_html = ""
+        if delta:
+            css = "kpi-delta negative" if str(delta).lstrip().startswith("-") else "kpi-delta"
+            delta_html = f'<div class="{css}">{escape(str(delta))}</div>'
+        cards.append(
+            f'<div class="kpi-card"{title}>'
+            f'<div class="kpi-label">{escape(data.get("label", ""))}</div>'
+            f'<div class="kpi-value">{escape(str(data.get("value", "—")))}</div>'
+            f"{delta_html}</div>"
+        )
+
+    st.markdown(
+        f'<div class="kpi-grid" style="--kpi-cols:{columns}">{"".join(cards)}</div>',
+        unsafe_allow_html=True,
+    )